@@ -3,8 +3,8 @@
 ================================================================================
 ADS-B Data Collector with Flight Lifecycle Management
 ================================================================================
-Version:        2.2.0
-Last Updated:   2026-01-21
+Version:        2.3.0
+Last Updated:   2026-10-15
 Author:         ADS-B Flight Tracker Route Detection System
 Description:    Enhanced ADS-B data collector with proper flight ending logic
                 to prevent duplicate aircraft in current view.
@@ -17,7 +17,7 @@ Features:
     - Downloads and caches aircraft database from ADS-B Exchange
     - Real-time alert system (ICAO, callsign, altitude, squawk)
     - Automatic route detection every 10 seconds
-    - Auto-restart after 20,000 messages to prevent memory bloat
+    - Bounded caches; peak memory logged, SIGUSR1 clears caches in an emergency
 
 New in 2.2.0:
     - Flights are properly marked as ended when aircraft disappears
@@ -27,17 +27,51 @@ New in 2.2.0:
 
 Dependencies:
     - oracledb: Oracle database connectivity
+    - orjson: Fast JSON parsing for the aircraft database
     - route_detector: Route detection module (must be in same directory)
 
+Database scripts (run once as the schema owner, with the collector stopped):
+    flight_stats_columns.sql - Per-flight position totals on flights; until it
+                               has been run the collector detects the missing
+                               columns at startup and writes last_contact and
+                               callsign only (restart after running it)
+
 Configuration:
     - ADSB_HOST: IP address of ADS-B receiver (default: 192.168.10.139)
     - ADSB_PORT: BaseStation port (default: 30003)
     - DB_USER, DB_PASSWORD, DB_DSN: Oracle connection settings
-    - MAX_MESSAGES_BEFORE_RESTART: Auto-restart threshold (default: 20000)
+    - DB_POOL_MIN, DB_POOL_MAX: Oracle connection pool size (2-4)
+    - MEMORY_WARNING_MB: Peak RSS that triggers a warning at cleanup (1024)
     - FLIGHT_TIMEOUT_MINUTES: Minutes before flight is considered ended (60)
     - CLEANUP_INTERVAL_SECONDS: How often to run cleanup (600 = 10 min)
 
 Version History:
+    2.3.0 (2026-10-15) - Write path performance
+        - Position inserts buffered and written with executemany per commit
+        - Known aircraft cached in memory; last_seen updates batched per commit
+        - Flight last_contact/callsign written once per flight per commit
+        - Per-flight position count, max altitude and speed totals kept on flights (same UPDATE,
+          once flight_stats_columns.sql has been run)
+        - Failed writer passes roll back and replay their messages; buffers cleared only after commit
+        - Aircraft database parsed with orjson and stored as compact parallel arrays
+        - Feed read into a reusable bytes buffer (no quadratic string concat)
+        - Alert rules compiled into lookup tables; alert writes batched per commit
+        - Route detection only re-runs for flights with new positions (no scan query)
+        - Flight cache kept in last_seen order; stale cleanup stops at first fresh entry
+        - Flight cache bounded (MAX_ACTIVE_FLIGHTS) with scan-resistant LRU-2 eviction
+        - Database writes moved to a writer thread fed by a bounded queue
+        - New aircraft upserted with one MERGE executemany per writer batch
+        - Aircraft database streamed to basic-ac-db.json.gz and parsed in one pass
+        - Connection pool; route detection on its own connection, array-fetch startup loads
+        - Removed the auto-restart; peak RSS logged at cleanup, caches cleared on SIGUSR1
+        - ICAO, callsign and squawk strings interned at parse time
+        - Non-MSG lines rejected on raw bytes before decode/split
+        - Timestamps parsed by fixed-width slicing instead of strptime
+        - Commit when 5,000 position rows are pending or after 2 seconds
+        - Aircraft that already have a photo_url skip the photo UPDATE
+        - Aircraft database download skipped when the local copy is under a day old
+        - Hot SQL hoisted into module constants; statement cache sized on the pool
+    
     2.2.0 (2026-01-21) - Flight lifecycle management
         - Added flight ending logic
         - Prevent duplicate aircraft in views
@@ -55,14 +89,20 @@ Version History:
 """
 
 import socket
+import select
 import oracledb
 from datetime import datetime, timedelta
 import time
 import sys
 import os
-from collections import defaultdict
-import json
+import signal
+import resource
+import queue
+import threading
+from collections import OrderedDict
 import gzip
+import shutil
+import orjson
 import urllib.request
 from route_detector import RouteDetector
 #from enhanced_route_detector import EnhancedRouteDetector as RouteDetector
@@ -70,24 +110,257 @@ from route_detector import RouteDetector
 # Configuration
 ADSB_HOST = '192.168.10.139'
 ADSB_PORT = 30003
+RECV_BUFFER_SIZE = 65536  # Bytes read from the feed per recv call
 
 # Oracle Database Configuration - UPDATE THESE
 DB_USER = 'adsb_user'
 DB_PASSWORD = 'oracle'
 DB_DSN = 'localhost:1521/FREEPDB1'  # For Oracle 23ai Free in Docker
 
-# Auto-restart configuration
-MAX_MESSAGES_BEFORE_RESTART = 10000  # Restart after this many messages
+# Connection pool: writer and route detector each hold one connection,
+# the rest serve startup loads
+DB_POOL_MIN = 2
+DB_POOL_MAX = 4
+FETCH_ARRAY_SIZE = 5000  # Rows per round-trip for bulk SELECTs
+STATEMENT_CACHE_SIZE = 50  # Parsed statements cached per connection
+
+# Memory monitoring (caches are bounded, so the collector no longer restarts itself)
+MEMORY_WARNING_MB = 1024  # Warn when peak RSS goes above this
 
 # Flight lifecycle configuration
 FLIGHT_TIMEOUT_MINUTES = 60  # Mark flight as ended after this many minutes of no updates
 CLEANUP_INTERVAL_SECONDS = 600  # Run cleanup every 10 minutes
+MAX_ACTIVE_FLIGHTS = 32768  # Upper bound on cached active flights
+
+# Aircraft database (ADS-B Exchange), downloaded at startup
+AIRCRAFT_DB_URL = 'http://downloads.adsbexchange.com/downloads/basic-ac-db.json.gz'
+AIRCRAFT_DB_FILE = 'basic-ac-db.json.gz'  # Local copy, used if the download fails
+AIRCRAFT_DB_MAX_AGE_HOURS = 24  # Reuse the local copy instead of downloading if newer than this
+
+# Insert a new aircraft, or just refresh it if another session already added it
+MERGE_AIRCRAFT_SQL = """MERGE INTO aircraft a
+    USING (SELECT :icao AS icao_address, :reg AS registration, :type AS aircraft_type,
+                  :mfr AS manufacturer, :mdl AS model, :op AS operator, :photo AS photo_url
+           FROM dual) src
+    ON (a.icao_address = src.icao_address)
+    WHEN MATCHED THEN UPDATE
+        SET a.last_seen = CURRENT_TIMESTAMP,
+            a.photo_url = NVL(a.photo_url, src.photo_url)
+    WHEN NOT MATCHED THEN INSERT
+        (icao_address, registration, aircraft_type, manufacturer, model, operator, photo_url)
+        VALUES (src.icao_address, src.registration, src.aircraft_type,
+                src.manufacturer, src.model, src.operator, src.photo_url)"""
+
+# Hot-path statements, kept as module constants so every execute reuses the
+# same text and hits the client statement cache
+
+# Most recent active flight for an aircraft (resume after a cache miss)
+FIND_ACTIVE_FLIGHT_SQL = """SELECT flight_id, callsign 
+    FROM flights 
+    WHERE icao_address = :icao 
+      AND is_active = 1
+      AND last_contact > SYSDATE - (:timeout/1440)
+    ORDER BY last_contact DESC
+    FETCH FIRST 1 ROWS ONLY"""
+
+# New flight
+INSERT_FLIGHT_SQL = """INSERT INTO flights (icao_address, callsign, is_active) 
+    VALUES (:icao, :call, 1) 
+    RETURNING flight_id INTO :fid"""
+
+# Per-commit aircraft updates
+UPDATE_AIRCRAFT_PHOTO_SQL = """UPDATE aircraft 
+    SET last_seen = CURRENT_TIMESTAMP,
+        photo_url = :photo
+    WHERE icao_address = :icao 
+      AND (photo_url IS NULL OR registration IS NULL)"""
+UPDATE_AIRCRAFT_LAST_SEEN_SQL = "UPDATE aircraft SET last_seen = CURRENT_TIMESTAMP WHERE icao_address = :icao"
+
+# Per-commit flight updates
+UPDATE_FLIGHT_CALLSIGN_SQL = """UPDATE flights 
+    SET last_contact = CURRENT_TIMESTAMP,
+        callsign = :call
+    WHERE flight_id = :fid"""
+UPDATE_FLIGHT_CONTACT_SQL = "UPDATE flights SET last_contact = CURRENT_TIMESTAMP WHERE flight_id = :fid"
+
+# The same updates plus running totals read by the webapp's history page
+# (position_count/max_altitude/speed_sum/speed_count, added by
+# flight_stats_columns.sql; used only once those columns exist)
+FLIGHT_STATS_COLUMNS = ('POSITION_COUNT', 'MAX_ALTITUDE', 'SPEED_SUM', 'SPEED_COUNT')
+FLIGHT_STATS_SET = """position_count = position_count + :npos,
+        max_altitude = GREATEST(NVL(max_altitude, :maxalt), NVL(:maxalt, max_altitude)),
+        speed_sum = speed_sum + :ssum,
+        speed_count = speed_count + :scnt"""
+UPDATE_FLIGHT_CALLSIGN_STATS_SQL = f"""UPDATE flights 
+    SET last_contact = CURRENT_TIMESTAMP,
+        callsign = :call,
+        {FLIGHT_STATS_SET}
+    WHERE flight_id = :fid"""
+UPDATE_FLIGHT_CONTACT_STATS_SQL = f"""UPDATE flights 
+    SET last_contact = CURRENT_TIMESTAMP,
+        {FLIGHT_STATS_SET}
+    WHERE flight_id = :fid"""
+
+# Alert writes
+INSERT_ALERT_HISTORY_SQL = """INSERT INTO alert_history 
+    (alert_id, flight_id, icao_address, callsign, altitude, latitude, longitude)
+    VALUES (:aid, :fid, :icao, :call, :alt, :lat, :lon)"""
+UPDATE_ALERT_TRIGGERED_SQL = "UPDATE alerts SET last_triggered = CURRENT_TIMESTAMP WHERE alert_id = :aid"
+
+# Position rows
+INSERT_POSITION_SQL = """INSERT INTO positions (
+        flight_id, icao_address, msg_type, transmission_type,
+        reported_time, callsign, altitude, ground_speed, track,
+        latitude, longitude, vertical_rate, squawk,
+        alert, emergency, spi, is_on_ground
+    ) VALUES (
+        :fid, :icao, :msg, :trans,
+        :rtime, :call, :alt, :speed, :track,
+        :lat, :lon, :vrate, :squawk,
+        :alert, :emerg, :spi, :ground
+    )"""
+
+# Writer thread configuration
+MESSAGE_QUEUE_SIZE = 50000  # Parsed messages buffered while the database is busy
+WRITER_BATCH_SIZE = 1000  # Max messages the writer takes off the queue per pass
+COMMIT_ROW_THRESHOLD = 5000  # Commit once this many position rows are pending...
+COMMIT_INTERVAL_SECONDS = 2  # ...or this long after the last commit
+ROUTE_DETECTION_INTERVAL_SECONDS = 10  # Run route detection this often
+WRITER_MAX_RETRIES = 3  # Replays of a failed commit's messages before they are dropped
+
+class AircraftDatabase:
+    """
+    Compact in-memory copy of the ADS-B Exchange aircraft database
+    Fields are stored as parallel lists indexed by ICAO instead of one dict
+    per aircraft; low-cardinality strings (type, manufacturer, ...) are
+    interned so repeated values share a single object
+    """
+    __slots__ = ('index', 'registration', 'aircraft_type', 'manufacturer', 'model', 'ownop')
+    
+    def __init__(self):
+        self.clear()
+    
+    def __len__(self):
+        return len(self.index)
+    
+    def clear(self):
+        self.index = {}  # key: icao_address, value: row number in the field lists
+        self.registration = []
+        self.aircraft_type = []
+        self.manufacturer = []
+        self.model = []
+        self.ownop = []
+    
+    def add(self, icao, registration, aircraft_type, manufacturer, model, ownop):
+        intern = sys.intern
+        row = (
+            registration or '',
+            intern(aircraft_type or ''),
+            intern(manufacturer or ''),
+            intern(model or ''),
+            intern(ownop or '')
+        )
+        columns = (self.registration, self.aircraft_type, self.manufacturer, self.model, self.ownop)
+        i = self.index.get(icao)
+        if i is None:
+            self.index[icao] = len(self.registration)
+            for column, value in zip(columns, row):
+                column.append(value)
+        else:
+            for column, value in zip(columns, row):
+                column[i] = value
+    
+    def get(self, icao, default=None):
+        """Return the aircraft record as a dict, or default if unknown"""
+        i = self.index.get(icao)
+        if i is None:
+            return default
+        return {
+            'registration': self.registration[i],
+            'aircraft_type': self.aircraft_type[i],
+            'manufacturer': self.manufacturer[i],
+            'model': self.model[i],
+            'ownop': self.ownop[i]
+        }
+    
+    def get_registration(self, icao):
+        """Return just the registration (or None) without building a record dict"""
+        i = self.index.get(icao)
+        return self.registration[i] if i is not None else None
+
+class FlightCache:
+    """
+    Size-bounded LRU-2 style cache of active flights keyed by ICAO address
+    Aircraft seen only once sit in a probation segment and are evicted first,
+    so a burst of one-off ICAOs cannot push out flights that keep reporting.
+    A second lookup promotes the entry to the protected segment. Both
+    segments are kept least- to most-recently seen so stale entries are
+    always at the front.
+    """
+    __slots__ = ('max_size', 'probation', 'protected')
+    
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+    
+    def __len__(self):
+        return len(self.probation) + len(self.protected)
+    
+    def clear(self):
+        self.probation.clear()
+        self.protected.clear()
+    
+    def get(self, icao):
+        """Return the flight info for icao (or None), recording the access"""
+        flight_info = self.protected.get(icao)
+        if flight_info is not None:
+            self.protected.move_to_end(icao)
+            return flight_info
+        flight_info = self.probation.pop(icao, None)
+        if flight_info is not None:
+            self.protected[icao] = flight_info
+        return flight_info
+    
+    def peek(self, icao):
+        """Return the flight info for icao (or None) without recording an access"""
+        flight_info = self.protected.get(icao)
+        if flight_info is None:
+            flight_info = self.probation.get(icao)
+        return flight_info
+    
+    def add(self, icao, flight_info):
+        """Insert a newly seen flight, evicting the coldest entry when full"""
+        self.protected.pop(icao, None)
+        self.probation[icao] = flight_info
+        if len(self) > self.max_size:
+            if self.probation:
+                self.probation.popitem(last=False)
+            else:
+                self.protected.popitem(last=False)
+    
+    def discard(self, icao):
+        """Forget icao's flight (e.g. its INSERT was rolled back)"""
+        self.probation.pop(icao, None)
+        self.protected.pop(icao, None)
+    
+    def pop_stale(self, cutoff_time):
+        """Drop entries last seen before cutoff_time and return how many were removed"""
+        removed = 0
+        for segment in (self.probation, self.protected):
+            while segment:
+                flight_info = next(iter(segment.values()))
+                if flight_info['last_seen'] >= cutoff_time:
+                    break
+                segment.popitem(last=False)
+                removed += 1
+        return removed
 
 # Track active flights to avoid creating duplicates
-active_flights = {}  # key: icao_address, value: {'flight_id': X, 'last_seen': datetime}
+active_flights = FlightCache(MAX_ACTIVE_FLIGHTS)  # value: {'flight_id': X, 'callsign': str, 'last_seen': datetime}
 
 # Aircraft database cache
-aircraft_db = {}
+aircraft_db = AircraftDatabase()
 
 # Airline database cache
 airline_db = {}
@@ -95,15 +368,62 @@ airline_db = {}
 # Alert rules cache
 alert_rules = []
 
+# Alert rules indexed by match value: key: value, value: [(alert_id, description), ...]
+icao_alerts = {}
+callsign_alerts = {}
+squawk_alerts = {}
+
+# Altitude alert rules: [(threshold, (alert_id, description)), ...]
+altitude_above_alerts = []
+altitude_below_alerts = []
+
+# Triggered alerts waiting for the next commit
+pending_alerts = []  # alert_history rows
+triggered_alerts = set()  # alert_ids whose last_triggered needs updating
+
+# ICAO addresses already present in the aircraft table
+known_aircraft = set()
+
+# ICAO addresses whose aircraft row already has a photo_url (no photo UPDATE needed)
+photo_url_set = set()
+
+# True once flight_stats_columns.sql has added the per-flight totals columns
+flight_stats_enabled = False
+
+# Known aircraft seen since the last commit (last_seen written in one batch)
+touched_aircraft = set()
+
+# Flights seen since the last commit: key: flight_id, value: latest callsign (or None)
+dirty_flights = {}
+
+# Position rows buffered until the next commit (written with executemany)
+pending_positions = []
+
+# Aircraft merged and flights inserted since the last commit; a rollback
+# undoes those rows, so they are dropped from the caches when one happens
+uncommitted_aircraft = set()
+uncommitted_flights = set()  # ICAO addresses whose active flight was created this transaction
+uncommitted_photos = set()  # Known aircraft given a photo_url this transaction
+
+# ICAO addresses with a new positioned report since the last route detection run
+route_candidates = set()
+
+# Parsed messages handed from the socket reader to the database writer thread
+message_queue = queue.Queue(maxsize=MESSAGE_QUEUE_SIZE)
+dropped_messages = 0  # Oldest messages discarded because the queue was full
+
+# Writer thread control
+writer_stop = threading.Event()  # Set by the reader to drain, commit and exit
+cache_clear_requested = threading.Event()  # Set on SIGUSR1; the writer clears its caches
+
+# Unique callsigns seen by the reader (debug output only)
+callsigns_seen = set()
+
 # Route detector instance
 route_detector = None
 
-# Track last cleanup time
-last_cleanup_time = time.time()
-
 def load_airline_database(cursor):
     """Load airline/callsign prefix database from Oracle"""
-    global airline_db
     try:
         cursor.execute("SELECT callsign_prefix, airline_name FROM airlines WHERE is_active = 1")
         for prefix, name in cursor.fetchall():
@@ -113,7 +433,7 @@ def load_airline_database(cursor):
         print(f"Could not load airlines (table may not exist yet): {e}")
 
 def load_alert_rules(cursor):
-    """Load active alert rules from database"""
+    """Load active alert rules from database and index them by what they match"""
     global alert_rules
     try:
         cursor.execute("""
@@ -122,9 +442,40 @@ def load_alert_rules(cursor):
             WHERE is_active = 1
         """)
         alert_rules = cursor.fetchall()
-        print(f"Loaded {len(alert_rules)} active alert rules")
     except Exception as e:
         print(f"Could not load alerts (table may not exist yet): {e}")
+        return
+    
+    # Pre-uppercase keys and pre-parse thresholds once instead of per message
+    for table in (icao_alerts, callsign_alerts, squawk_alerts):
+        table.clear()
+    altitude_above_alerts.clear()
+    altitude_below_alerts.clear()
+    
+    for alert_id, alert_type, alert_value in alert_rules:
+        if not alert_value:
+            continue
+        rule = (alert_id, f"{alert_type}={alert_value}")
+        
+        if alert_type == 'ICAO':
+            icao_alerts.setdefault(alert_value.upper(), []).append(rule)
+        elif alert_type == 'CALLSIGN':
+            callsign_alerts.setdefault(alert_value.upper(), []).append(rule)
+        elif alert_type == 'SQUAWK':
+            squawk_alerts.setdefault(alert_value, []).append(rule)
+        elif alert_type == 'ALTITUDE':
+            # Format: ">35000" or "<10000"
+            try:
+                threshold = int(alert_value[1:])
+            except ValueError:
+                print(f"Ignoring alert {alert_id}: invalid altitude rule {alert_value}")
+                continue
+            if alert_value.startswith('>'):
+                altitude_above_alerts.append((threshold, rule))
+            elif alert_value.startswith('<'):
+                altitude_below_alerts.append((threshold, rule))
+    
+    print(f"Loaded {len(alert_rules)} active alert rules")
 
 def cleanup_stale_flights(cursor):
     """
@@ -136,257 +487,233 @@ def cleanup_stale_flights(cursor):
         cursor.callproc('end_stale_flights')
         
         # Clean up local cache - remove flights we haven't seen recently
-        current_time = datetime.now()
-        stale_icaos = []
+        cutoff_time = datetime.now() - timedelta(minutes=FLIGHT_TIMEOUT_MINUTES)
+        stale_count = active_flights.pop_stale(cutoff_time)
         
-        for icao, flight_info in active_flights.items():
-            if current_time - flight_info['last_seen'] > timedelta(minutes=FLIGHT_TIMEOUT_MINUTES):
-                stale_icaos.append(icao)
-        
-        for icao in stale_icaos:
-            del active_flights[icao]
-        
-        if stale_icaos:
-            print(f"Cleaned up {len(stale_icaos)} stale flights from cache")
+        if stale_count:
+            print(f"Cleaned up {stale_count} stale flights from cache")
             
     except Exception as e:
         print(f"Error during flight cleanup: {e}")
 
-def check_alerts(cursor, data, flight_id):
+def check_alerts(data, flight_id):
     """Check if this position triggers any alerts"""
     if not alert_rules:
         return
     
-    for alert_id, alert_type, alert_value in alert_rules:
-        triggered = False
-        
-        if alert_type == 'ICAO' and data['icao_address'] == alert_value.upper():
-            triggered = True
-        elif alert_type == 'CALLSIGN' and data['callsign'] == alert_value.upper():
-            triggered = True
-        elif alert_type == 'SQUAWK' and data['squawk'] == alert_value:
-            triggered = True
-        elif alert_type == 'ALTITUDE' and data['altitude']:
-            # Format: ">35000" or "<10000"
-            try:
-                if alert_value.startswith('>') and data['altitude'] > int(alert_value[1:]):
-                    triggered = True
-                elif alert_value.startswith('<') and data['altitude'] < int(alert_value[1:]):
-                    triggered = True
-            except:
-                pass
-        
-        if triggered:
-            try:
-                cursor.execute("""
-                    INSERT INTO alert_history 
-                    (alert_id, flight_id, icao_address, callsign, altitude, latitude, longitude)
-                    VALUES (:aid, :fid, :icao, :call, :alt, :lat, :lon)
-                """,
-                    aid=alert_id,
-                    fid=flight_id,
-                    icao=data['icao_address'],
-                    call=data['callsign'],
-                    alt=data['altitude'],
-                    lat=data['latitude'],
-                    lon=data['longitude']
-                )
-                
-                # Update last_triggered timestamp
-                cursor.execute("""
-                    UPDATE alerts 
-                    SET last_triggered = CURRENT_TIMESTAMP 
-                    WHERE alert_id = :aid
-                """, aid=alert_id)
-                
-                print(f"ALERT TRIGGERED: {alert_type}={alert_value} for {data['icao_address']} / {data['callsign']}")
-            except Exception as e:
-                print(f"Error recording alert: {e}")
+    triggered = [
+        *icao_alerts.get(data['icao_address'], ()),
+        *callsign_alerts.get(data['callsign'], ()),
+        *squawk_alerts.get(data['squawk'], ())
+    ]
+    
+    altitude = data['altitude']
+    if altitude:
+        for threshold, rule in altitude_above_alerts:
+            if altitude > threshold:
+                triggered.append(rule)
+        for threshold, rule in altitude_below_alerts:
+            if altitude < threshold:
+                triggered.append(rule)
+    
+    # alert_history rows and last_triggered updates are written at the next commit
+    for alert_id, description in triggered:
+        pending_alerts.append({
+            'aid': alert_id,
+            'fid': flight_id,
+            'icao': data['icao_address'],
+            'call': data['callsign'],
+            'alt': data['altitude'],
+            'lat': data['latitude'],
+            'lon': data['longitude']
+        })
+        triggered_alerts.add(alert_id)
+        print(f"ALERT TRIGGERED: {description} for {data['icao_address']} / {data['callsign']}")
 
 def download_aircraft_database():
     """
     Download the latest ADS-B Exchange aircraft database
     Updated daily from government and various sources
+    The gzip file is streamed straight to AIRCRAFT_DB_FILE and kept as the
+    local copy; it is parsed from disk afterwards
     """
-    url = 'http://downloads.adsbexchange.com/downloads/basic-ac-db.json.gz'
-    print(f"Downloading aircraft database from {url}...")
+    print(f"Downloading aircraft database from {AIRCRAFT_DB_URL}...")
     
+    temp_file = AIRCRAFT_DB_FILE + '.tmp'
     try:
-        data = {}
-        with urllib.request.urlopen(url) as response:
-            with gzip.GzipFile(fileobj=response) as f:
-                line_num = 0
-                for line in f:
-                    line_num += 1
-                    line = line.decode('utf-8').strip()
-                    
-                    if not line:
-                        continue
-                    
-                    try:
-                        # Parse each line as a separate JSON object
-                        obj = json.loads(line)
-                        
-                        # Each line should have an 'icao' field that's the key
-                        if 'icao' in obj:
-                            icao = obj['icao']
-                            data[icao] = obj
-                            
-                    except json.JSONDecodeError:
-                        continue
-                
-                if data:
-                    print(f"Successfully downloaded {len(data)} aircraft from database")
-                    return data
-                else:
-                    print("Failed to parse database")
-                    return None
-                        
+        with urllib.request.urlopen(AIRCRAFT_DB_URL) as response, open(temp_file, 'wb') as f:
+            shutil.copyfileobj(response, f, 1024 * 1024)
+        # Only replace the previous copy once the download is complete
+        os.replace(temp_file, AIRCRAFT_DB_FILE)
+        print(f"Saved aircraft database to {AIRCRAFT_DB_FILE}")
+        return True
+    
     except Exception as e:
         print(f"Error downloading database: {e}")
-        return None
+        return False
 
 def load_aircraft_database():
     """
-    Load aircraft database from ADS-B Exchange JSON
-    Format: {"icao": {"r": "registration", "t": "type", ...}, ...}
+    Load aircraft database from the ADS-B Exchange gzip file
+    Format: one JSON object per line, {"icao": ..., "reg": ..., "icaotype": ...}
     """
-    global aircraft_db
+    # The source is updated daily, so a recent local copy is used as-is
+    try:
+        age_hours = (time.time() - os.path.getmtime(AIRCRAFT_DB_FILE)) / 3600
+    except OSError:
+        age_hours = None
     
-    # Try to download fresh database
-    data = download_aircraft_database()
+    if age_hours is not None and age_hours < AIRCRAFT_DB_MAX_AGE_HOURS:
+        print(f"Using local {AIRCRAFT_DB_FILE} ({age_hours:.1f} hours old)")
+    # Try to download fresh database, falling back to the last downloaded copy
+    elif not download_aircraft_database():
+        print(f"Trying to load from local {AIRCRAFT_DB_FILE}...")
     
-    if not data:
-        # Try to load from local file if download failed
-        try:
-            print("Trying to load from local basic-ac-db.json...")
-            with open('basic-ac-db.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except FileNotFoundError:
-            print("Warning: No aircraft database available.")
-            print("Download manually from: http://downloads.adsbexchange.com/downloads/basic-ac-db.json.gz")
-            return
-    
-    # Parse the database - handle different possible formats
-    for icao, info in data.items():
-        # Check if info is a dict or string
-        if isinstance(info, dict):
-            # The actual format uses 'reg' and 'icaotype' field names
-            aircraft_db[icao.upper()] = {
-                'registration': info.get('reg', '') or info.get('r', ''),
-                'aircraft_type': info.get('icaotype', '') or info.get('t', ''),
-                'manufacturer': info.get('manufacturer', ''),
-                'model': info.get('model', ''),
-                'ownop': info.get('ownop', '')
-            }
-        elif isinstance(info, str):
-            # If it's just a string (maybe registration only?)
-            aircraft_db[icao.upper()] = {
-                'registration': info,
-                'aircraft_type': '',
-                'manufacturer': '',
-                'model': '',
-                'ownop': ''
-            }
-        else:
-            # Skip if we don't understand the format
-            continue
+    try:
+        with gzip.open(AIRCRAFT_DB_FILE, 'rb') as f:
+            for line in f:
+                line = line.strip()
+                
+                if not line:
+                    continue
+                
+                try:
+                    # Parse each line as a separate JSON object (orjson takes bytes directly)
+                    info = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue
+                
+                # Each line should have an 'icao' field that's the key
+                # The actual format uses 'reg' and 'icaotype' field names
+                if isinstance(info, dict) and 'icao' in info:
+                    aircraft_db.add(
+                        info['icao'].upper(),
+                        info.get('reg') or info.get('r'),
+                        info.get('icaotype') or info.get('t'),
+                        info.get('manufacturer'),
+                        info.get('model'),
+                        info.get('ownop')
+                    )
+    except (OSError, EOFError) as e:
+        print(f"Warning: No aircraft database available ({e}).")
+        print(f"Download manually from: {AIRCRAFT_DB_URL}")
+        return
     
     print(f"Loaded {len(aircraft_db)} aircraft records from database")
     
     # Debug: Show a sample entry if we have data
     if aircraft_db:
-        sample_icao = list(aircraft_db.keys())[0]
-        sample_data = aircraft_db[sample_icao]
+        sample_icao = next(iter(aircraft_db.index))
+        sample_data = aircraft_db.get(sample_icao)
         print(f"Sample aircraft data - ICAO: {sample_icao}, Data: {sample_data}")
-    
-    # Save to local file for backup
-    try:
-        with open('basic-ac-db.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f)
-        print("Saved aircraft database to basic-ac-db.json for backup")
-    except Exception as e:
-        print(f"Could not save backup file: {e}")
 
-def connect_to_database():
-    """Connect to Oracle database"""
+def init_session(connection, requested_tag):
+    """Pool session callback: set session timezone to Central Time on new connections"""
+    cursor = connection.cursor()
+    cursor.execute("ALTER SESSION SET TIME_ZONE = 'America/Chicago'")
+    cursor.close()
+
+def create_database_pool():
+    """Create the Oracle connection pool"""
     try:
-        connection = oracledb.connect(
+        pool = oracledb.create_pool(
             user=DB_USER,
             password=DB_PASSWORD,
-            dsn=DB_DSN
+            dsn=DB_DSN,
+            min=DB_POOL_MIN,
+            max=DB_POOL_MAX,
+            increment=1,
+            stmtcachesize=STATEMENT_CACHE_SIZE,
+            session_callback=init_session
         )
-        print(f"Connected to Oracle Database: {DB_DSN}")
-        
-        # Set session timezone to Central Time
-        cursor = connection.cursor()
-        cursor.execute("ALTER SESSION SET TIME_ZONE = 'America/Chicago'")
-        cursor.close()
+        print(f"Connected to Oracle Database: {DB_DSN} (pool {DB_POOL_MIN}-{DB_POOL_MAX})")
         print("Session timezone set to America/Chicago (Central Time)")
         
-        return connection
+        return pool
     except Exception as e:
         print(f"Database connection failed: {e}")
         sys.exit(1)
 
+def bulk_cursor(connection):
+    """Cursor tuned for large result sets: fewer round-trips per fetch"""
+    cursor = connection.cursor()
+    cursor.arraysize = FETCH_ARRAY_SIZE
+    cursor.prefetchrows = FETCH_ARRAY_SIZE
+    return cursor
+
+def load_known_aircraft(cursor):
+    """Load the ICAO addresses already stored in the aircraft table"""
+    cursor.execute("SELECT icao_address FROM aircraft")
+    known_aircraft.update(row[0] for row in cursor)
+    cursor.execute("SELECT icao_address FROM aircraft WHERE photo_url IS NOT NULL")
+    photo_url_set.update(row[0] for row in cursor)
+    print(f"Loaded {len(known_aircraft)} known aircraft ({len(photo_url_set)} with photos)")
+
+def new_aircraft_row(icao_address):
+    """Build MERGE binds for an aircraft not yet in the aircraft table"""
+    # Look up aircraft info from database
+    aircraft_info = aircraft_db.get(icao_address.upper(), {})
+    registration = aircraft_info.get('registration')
+    aircraft_type = aircraft_info.get('aircraft_type')
+    manufacturer = aircraft_info.get('manufacturer')
+    model = aircraft_info.get('model')
+    operator = aircraft_info.get('ownop')
+    
+    # Build photo URL if we have registration
+    photo_url = None
+    if registration:
+        photo_url = f"https://www.jetphotos.com/registration/{registration}"
+    
+    # Debug: Log what we found
+    if registration or aircraft_type:
+        print(f"Adding new aircraft {icao_address}: Reg={registration}, Type={aircraft_type}, Op={operator}")
+    else:
+        print(f"Adding new aircraft {icao_address}: No registration/type data found in database")
+    
+    return {
+        'icao': icao_address,
+        'reg': registration,
+        'type': aircraft_type,
+        'mfr': manufacturer,
+        'mdl': model,
+        'op': operator,
+        'photo': photo_url
+    }
+
+def merge_aircraft(cursor, icao_addresses):
+    """
+    Upsert aircraft rows for ICAO addresses not yet known, in one executemany
+    Must run before flights are created for them (flights.icao_address FK)
+    """
+    rows = [new_aircraft_row(icao_address) for icao_address in icao_addresses]
+    if not rows:
+        return
+    
+    cursor.executemany(MERGE_AIRCRAFT_SQL, rows)
+    uncommitted_aircraft.update(icao_addresses)
+    known_aircraft.update(icao_addresses)
+    photo_url_set.update(row['icao'] for row in rows if row['photo'])
+
+def ensure_aircraft_batch(cursor, messages):
+    """Create every aircraft in a batch of parsed messages that isn't known yet"""
+    new_icaos = {
+        data['icao_address'] for data in messages
+        if data['icao_address'] and data['icao_address'] not in known_aircraft
+    }
+    merge_aircraft(cursor, new_icaos)
+
 def ensure_aircraft_exists(cursor, icao_address):
     """Make sure aircraft exists in database, create if not"""
-    cursor.execute(
-        "SELECT icao_address FROM aircraft WHERE icao_address = :icao",
-        icao=icao_address
-    )
-    if cursor.fetchone() is None:
-        # Look up aircraft info from database
-        aircraft_info = aircraft_db.get(icao_address.upper(), {})
-        registration = aircraft_info.get('registration')
-        aircraft_type = aircraft_info.get('aircraft_type')
-        manufacturer = aircraft_info.get('manufacturer')
-        model = aircraft_info.get('model')
-        operator = aircraft_info.get('ownop')
-        
-        # Build photo URL if we have registration
-        photo_url = None
-        if registration:
-            photo_url = f"https://www.jetphotos.com/registration/{registration}"
-        
-        # Debug: Log what we found
-        if registration or aircraft_type:
-            print(f"Adding new aircraft {icao_address}: Reg={registration}, Type={aircraft_type}, Op={operator}")
-        else:
-            print(f"Adding new aircraft {icao_address}: No registration/type data found in database")
-        
-        cursor.execute(
-            """INSERT INTO aircraft (icao_address, registration, aircraft_type, manufacturer, model, operator, photo_url) 
-               VALUES (:icao, :reg, :type, :mfr, :mdl, :op, :photo)""",
-            icao=icao_address,
-            reg=registration,
-            type=aircraft_type,
-            mfr=manufacturer,
-            mdl=model,
-            op=operator,
-            photo=photo_url
-        )
-    else:
-        # Update last_seen timestamp and photo_url if we now have registration
-        aircraft_info = aircraft_db.get(icao_address.upper(), {})
-        registration = aircraft_info.get('registration')
-        
-        if registration:
-            photo_url = f"https://www.jetphotos.com/registration/{registration}"
-            cursor.execute(
-                """UPDATE aircraft 
-                   SET last_seen = CURRENT_TIMESTAMP,
-                       photo_url = :photo
-                   WHERE icao_address = :icao 
-                     AND (photo_url IS NULL OR registration IS NULL)""",
-                photo=photo_url,
-                icao=icao_address
-            )
-        else:
-            cursor.execute(
-                "UPDATE aircraft SET last_seen = CURRENT_TIMESTAMP WHERE icao_address = :icao",
-                icao=icao_address
-            )
+    if icao_address in known_aircraft:
+        # last_seen/photo_url updates are written in one batch at the next commit
+        touched_aircraft.add(icao_address)
+        return
+    
+    merge_aircraft(cursor, [icao_address])
+
+def mark_flight_dirty(flight_id, callsign):
+    """Queue a last_contact (and callsign) update, keeping the latest callsign seen"""
+    dirty_flights[flight_id] = callsign or dirty_flights.get(flight_id)
 
 def get_or_create_flight(cursor, icao_address, callsign):
     """
@@ -396,39 +723,22 @@ def get_or_create_flight(cursor, icao_address, callsign):
     current_time = datetime.now()
     
     # Check if we have an active flight for this aircraft in our cache
-    if icao_address in active_flights:
-        flight_info = active_flights[icao_address]
+    flight_info = active_flights.get(icao_address)
+    if flight_info is not None:
         flight_id = flight_info['flight_id']
         
-        # Update last_seen time in cache
-        active_flights[icao_address]['last_seen'] = current_time
-        
-        # Update last_contact and callsign in database
+        # Update last_seen time (and latest callsign) in cache
+        flight_info['last_seen'] = current_time
         if callsign:
-            cursor.execute(
-                """UPDATE flights 
-                   SET last_contact = CURRENT_TIMESTAMP,
-                       callsign = :call
-                   WHERE flight_id = :fid""",
-                call=callsign,
-                fid=flight_id
-            )
-        else:
-            cursor.execute(
-                "UPDATE flights SET last_contact = CURRENT_TIMESTAMP WHERE flight_id = :fid",
-                fid=flight_id
-            )
+            flight_info['callsign'] = callsign
+        
+        # last_contact/callsign are written once per flight at the next commit
+        mark_flight_dirty(flight_id, callsign)
         return flight_id
     
     # Not in cache - check database for active flight
     cursor.execute(
-        """SELECT flight_id 
-           FROM flights 
-           WHERE icao_address = :icao 
-             AND is_active = 1
-             AND last_contact > SYSDATE - (:timeout/1440)
-           ORDER BY last_contact DESC
-           FETCH FIRST 1 ROWS ONLY""",
+        FIND_ACTIVE_FLIGHT_SQL,
         icao=icao_address,
         timeout=FLIGHT_TIMEOUT_MINUTES
     )
@@ -438,26 +748,14 @@ def get_or_create_flight(cursor, icao_address, callsign):
     if result:
         # Found an active flight in database - add to cache
         flight_id = result[0]
-        active_flights[icao_address] = {
+        active_flights.add(icao_address, {
             'flight_id': flight_id,
+            'callsign': callsign or result[1],
             'last_seen': current_time
-        }
+        })
         
-        # Update flight
-        if callsign:
-            cursor.execute(
-                """UPDATE flights 
-                   SET last_contact = CURRENT_TIMESTAMP,
-                       callsign = :call
-                   WHERE flight_id = :fid""",
-                call=callsign,
-                fid=flight_id
-            )
-        else:
-            cursor.execute(
-                "UPDATE flights SET last_contact = CURRENT_TIMESTAMP WHERE flight_id = :fid",
-                fid=flight_id
-            )
+        # Update flight at the next commit
+        mark_flight_dirty(flight_id, callsign)
         
         print(f"Resumed active flight {flight_id} for {icao_address}")
         return flight_id
@@ -465,74 +763,83 @@ def get_or_create_flight(cursor, icao_address, callsign):
     # No active flight found - create new one
     flight_id_var = cursor.var(int)
     cursor.execute(
-        """INSERT INTO flights (icao_address, callsign, is_active) 
-           VALUES (:icao, :call, 1) 
-           RETURNING flight_id INTO :fid""",
+        INSERT_FLIGHT_SQL,
         icao=icao_address,
         call=callsign if callsign else None,
         fid=flight_id_var
     )
     flight_id = flight_id_var.getvalue()[0]
+    uncommitted_flights.add(icao_address)
     
     # Add to cache
-    active_flights[icao_address] = {
+    active_flights.add(icao_address, {
         'flight_id': flight_id,
+        'callsign': callsign,
         'last_seen': current_time
-    }
+    })
     
     print(f"Created new flight {flight_id} for {icao_address} / {callsign}")
     
     return flight_id
 
+_intern = sys.intern
+
+def _parse_ts(d, t):
+    """
+    Parse the fixed-width BaseStation timestamp ('YYYY/MM/DD', 'HH:MM:SS.fff')
+    by slicing, which is much cheaper than strptime
+    """
+    return datetime(
+        int(d[0:4]), int(d[5:7]), int(d[8:10]),
+        int(t[0:2]), int(t[3:5]), int(t[6:8]),
+        int(t[9:15].ljust(6, '0'))
+    )
+
 def parse_basestation_message(line):
-    """Parse BaseStation format message from port 30003"""
-    fields = line.strip().split(',')
+    """Parse BaseStation format message (raw bytes line) from port 30003"""
+    # We're mainly interested in MSG types (ADS-B messages); reject the rest
+    # on the raw bytes before paying for decode and split
+    if not line.startswith(b'MSG,'):
+        return None
     
+    fields = line.decode('utf-8', errors='ignore').strip().split(',')
     if len(fields) < 22:
         return None
     
-    msg_type = fields[0]
-    
-    # We're mainly interested in MSG types (ADS-B messages)
-    if msg_type != 'MSG':
-        return None
+    # Unpack once into locals instead of indexing the list for every field
+    (_, transmission_type, _, _, icao_address, _, date_str, time_str, _, _,
+     callsign, altitude, ground_speed, track, latitude, longitude, vertical_rate,
+     squawk, alert, emergency, spi, is_on_ground) = fields[:22]
     
-    # Extract callsign and clean it up
-    callsign = fields[10].strip() if len(fields) > 10 and fields[10] else None
-    # Remove any whitespace and make uppercase
-    if callsign:
-        callsign = callsign.strip().upper()
-        # Only keep if it's not empty after stripping
-        if not callsign:
-            callsign = None
+    # Low-cardinality strings are interned so repeated values share one object
+    # and cache lookups on them hash once
+    icao_address = icao_address.strip()
+    # Remove any whitespace and make uppercase; None if empty after stripping
+    callsign = callsign.strip().upper()
+    squawk = squawk.strip()
     
     data = {
-        'msg_type': msg_type,
-        'transmission_type': int(fields[1]) if fields[1] else None,
-        'icao_address': fields[4].strip() if fields[4] else None,
-        'callsign': callsign,
-        'altitude': int(fields[11]) if fields[11] else None,
-        'ground_speed': int(fields[12]) if fields[12] else None,
-        'track': int(fields[13]) if fields[13] else None,
-        'latitude': float(fields[14]) if fields[14] else None,
-        'longitude': float(fields[15]) if fields[15] else None,
-        'vertical_rate': int(fields[16]) if fields[16] else None,
-        'squawk': fields[17].strip() if fields[17] else None,
-        'alert': int(fields[18]) if fields[18] else None,
-        'emergency': int(fields[19]) if fields[19] else None,
-        'spi': int(fields[20]) if fields[20] else None,
-        'is_on_ground': int(fields[21]) if fields[21] else None,
+        'msg_type': 'MSG',
+        'transmission_type': int(transmission_type) if transmission_type else None,
+        'icao_address': _intern(icao_address) if icao_address else None,
+        'callsign': _intern(callsign) if callsign else None,
+        'altitude': int(altitude) if altitude else None,
+        'ground_speed': int(ground_speed) if ground_speed else None,
+        'track': int(track) if track else None,
+        'latitude': float(latitude) if latitude else None,
+        'longitude': float(longitude) if longitude else None,
+        'vertical_rate': int(vertical_rate) if vertical_rate else None,
+        'squawk': _intern(squawk) if squawk else None,
+        'alert': int(alert) if alert else None,
+        'emergency': int(emergency) if emergency else None,
+        'spi': int(spi) if spi else None,
+        'is_on_ground': int(is_on_ground) if is_on_ground else None,
     }
     
     # Parse timestamp if available
-    if fields[6] and fields[7]:
+    if date_str and time_str:
         try:
-            date_str = fields[6]
-            time_str = fields[7]
-            data['reported_time'] = datetime.strptime(
-                f"{date_str} {time_str}", 
-                "%Y/%m/%d %H:%M:%S.%f"
-            )
+            data['reported_time'] = _parse_ts(date_str, time_str)
         except:
             data['reported_time'] = None
     else:
@@ -553,49 +860,451 @@ def store_position(cursor, data):
         flight_id = get_or_create_flight(cursor, data['icao_address'], data['callsign'])
         
         # Check if this triggers any alerts
-        check_alerts(cursor, data, flight_id)
+        check_alerts(data, flight_id)
         
-        # Insert position
-        cursor.execute(
-            """INSERT INTO positions (
-                flight_id, icao_address, msg_type, transmission_type,
-                reported_time, callsign, altitude, ground_speed, track,
-                latitude, longitude, vertical_rate, squawk,
-                alert, emergency, spi, is_on_ground
-            ) VALUES (
-                :fid, :icao, :msg, :trans,
-                :rtime, :call, :alt, :speed, :track,
-                :lat, :lon, :vrate, :squawk,
-                :alert, :emerg, :spi, :ground
-            )""",
-            fid=flight_id,
-            icao=data['icao_address'],
-            msg=data['msg_type'],
-            trans=data['transmission_type'],
-            rtime=data['reported_time'],
-            call=data['callsign'],
-            alt=data['altitude'],
-            speed=data['ground_speed'],
-            track=data['track'],
-            lat=data['latitude'],
-            lon=data['longitude'],
-            vrate=data['vertical_rate'],
-            squawk=data['squawk'],
-            alert=data['alert'],
-            emerg=data['emergency'],
-            spi=data['spi'],
-            ground=data['is_on_ground']
-        )
+        # Positioned reports make this flight a candidate for route detection
+        if data['latitude'] is not None and data['longitude'] is not None:
+            route_candidates.add(data['icao_address'])
+        
+        # Queue position for the next batched insert
+        pending_positions.append({
+            'fid': flight_id,
+            'icao': data['icao_address'],
+            'msg': data['msg_type'],
+            'trans': data['transmission_type'],
+            'rtime': data['reported_time'],
+            'call': data['callsign'],
+            'alt': data['altitude'],
+            'speed': data['ground_speed'],
+            'track': data['track'],
+            'lat': data['latitude'],
+            'lon': data['longitude'],
+            'vrate': data['vertical_rate'],
+            'squawk': data['squawk'],
+            'alert': data['alert'],
+            'emerg': data['emergency'],
+            'spi': data['spi'],
+            'ground': data['is_on_ground']
+        })
         
     except Exception as e:
         print(f"Error storing position: {e}")
         raise
 
+def flush_aircraft_updates(cursor):
+    """
+    Update last_seen (and photo_url if we now have registration) for every
+    known aircraft seen since the last commit
+    Aircraft in photo_url_set already have a photo and only get last_seen
+    """
+    if not touched_aircraft:
+        return
+    
+    photo_rows = []
+    last_seen_rows = []
+    for icao_address in touched_aircraft:
+        registration = None
+        if icao_address not in photo_url_set:
+            registration = aircraft_db.get_registration(icao_address.upper())
+        if registration:
+            photo_rows.append({
+                'photo': f"https://www.jetphotos.com/registration/{registration}",
+                'icao': icao_address
+            })
+        else:
+            last_seen_rows.append({'icao': icao_address})
+    
+    if photo_rows:
+        cursor.executemany(
+            UPDATE_AIRCRAFT_PHOTO_SQL,
+            photo_rows
+        )
+        # Matched rows now have a photo; unmatched ones already had one
+        photo_url_set.update(row['icao'] for row in photo_rows)
+        uncommitted_photos.update(row['icao'] for row in photo_rows)
+    if last_seen_rows:
+        cursor.executemany(
+            UPDATE_AIRCRAFT_LAST_SEEN_SQL,
+            last_seen_rows
+        )
+
+def flight_position_stats():
+    """
+    Per-flight totals of the buffered position rows:
+    key: flight_id, value: [positions, max altitude, speed sum, speed count]
+    """
+    stats = {}
+    for row in pending_positions:
+        flight_stats = stats.get(row['fid'])
+        if flight_stats is None:
+            flight_stats = stats[row['fid']] = [0, None, 0, 0]
+        flight_stats[0] += 1
+        altitude = row['alt']
+        if altitude is not None and (flight_stats[1] is None or altitude > flight_stats[1]):
+            flight_stats[1] = altitude
+        if row['speed'] is not None:
+            flight_stats[2] += row['speed']
+            flight_stats[3] += 1
+    return stats
+
+def detect_flight_stats_columns(cursor):
+    """Enable the per-flight totals if flight_stats_columns.sql has been run"""
+    global flight_stats_enabled
+    cursor.execute(f"""SELECT COUNT(*) FROM user_tab_columns
+        WHERE table_name = 'FLIGHTS'
+          AND column_name IN ({','.join(f"'{column}'" for column in FLIGHT_STATS_COLUMNS)})""")
+    flight_stats_enabled = cursor.fetchone()[0] == len(FLIGHT_STATS_COLUMNS)
+    if flight_stats_enabled:
+        print("Per-flight position totals enabled")
+    else:
+        print("WARNING: flights has no position total columns; run flight_stats_columns.sql "
+              "(collector stopped) to enable them. Writing last_contact/callsign only.")
+
+def flush_flight_updates(cursor):
+    """
+    Write one UPDATE per flight seen since the last commit: last_contact,
+    callsign, and (once flight_stats_columns.sql has been run) the flight's
+    position totals from the buffered rows
+    Must run before flush_positions, while the rows are still buffered
+    """
+    if not flight_stats_enabled:
+        flush_flight_contacts(cursor)
+        return
+    
+    position_stats = flight_position_stats()
+    
+    # New flights get positions without being marked dirty
+    for flight_id in position_stats:
+        if flight_id not in dirty_flights:
+            dirty_flights[flight_id] = None
+    
+    if not dirty_flights:
+        return
+    
+    callsign_rows = []
+    contact_rows = []
+    for flight_id, callsign in dirty_flights.items():
+        npos, maxalt, ssum, scnt = position_stats.get(flight_id, (0, None, 0, 0))
+        row = {'fid': flight_id, 'npos': npos, 'maxalt': maxalt, 'ssum': ssum, 'scnt': scnt}
+        if callsign:
+            row['call'] = callsign
+            callsign_rows.append(row)
+        else:
+            contact_rows.append(row)
+    
+    # maxalt is None for flights with no altitude in this batch
+    stats_sizes = dict(fid=int, npos=int, maxalt=int, ssum=int, scnt=int)
+    if callsign_rows:
+        cursor.setinputsizes(call=oracledb.DB_TYPE_VARCHAR, **stats_sizes)
+        cursor.executemany(
+            UPDATE_FLIGHT_CALLSIGN_STATS_SQL,
+            callsign_rows
+        )
+    if contact_rows:
+        cursor.setinputsizes(**stats_sizes)
+        cursor.executemany(
+            UPDATE_FLIGHT_CONTACT_STATS_SQL,
+            contact_rows
+        )
+
+def flush_flight_contacts(cursor):
+    """Write one last_contact/callsign UPDATE per flight seen since the last commit"""
+    if not dirty_flights:
+        return
+    
+    callsign_rows = []
+    contact_rows = []
+    for flight_id, callsign in dirty_flights.items():
+        if callsign:
+            callsign_rows.append({'call': callsign, 'fid': flight_id})
+        else:
+            contact_rows.append({'fid': flight_id})
+    
+    if callsign_rows:
+        cursor.executemany(
+            UPDATE_FLIGHT_CALLSIGN_SQL,
+            callsign_rows
+        )
+    if contact_rows:
+        cursor.executemany(
+            UPDATE_FLIGHT_CONTACT_SQL,
+            contact_rows
+        )
+
+def flush_alerts(cursor):
+    """Record alerts triggered since the last commit"""
+    if not pending_alerts:
+        return
+    
+    try:
+        cursor.executemany(
+            INSERT_ALERT_HISTORY_SQL,
+            pending_alerts
+        )
+        
+        # Update last_triggered timestamp
+        cursor.executemany(
+            UPDATE_ALERT_TRIGGERED_SQL,
+            [{'aid': alert_id} for alert_id in triggered_alerts]
+        )
+    except Exception as e:
+        print(f"Error recording alerts: {e}")
+
+def flush_positions(cursor):
+    """Write buffered position rows to Oracle in a single executemany call"""
+    if not pending_positions:
+        return
+    
+    # Pre-declare bind types so None values in the first row don't
+    # force type inference for the whole batch
+    cursor.setinputsizes(
+        fid=int, icao=oracledb.DB_TYPE_VARCHAR, msg=oracledb.DB_TYPE_VARCHAR,
+        trans=int, rtime=oracledb.DB_TYPE_TIMESTAMP, call=oracledb.DB_TYPE_VARCHAR,
+        alt=int, speed=int, track=int, lat=float, lon=float, vrate=int,
+        squawk=oracledb.DB_TYPE_VARCHAR, alert=int, emerg=int, spi=int, ground=int
+    )
+    # Rows rejected individually are reported and skipped; a whole-batch
+    # failure raises and the writer rolls back and replays
+    cursor.executemany(
+        INSERT_POSITION_SQL,
+        pending_positions,
+        batcherrors=True
+    )
+    for error in cursor.getbatcherrors():
+        print(f"Error storing position (batch row {error.offset}): {error.message}")
+
+def flush_pending_writes(cursor):
+    """
+    Write all buffered work to Oracle
+    Must run before every commit so the commit covers all queued work
+    The buffers are kept until the commit succeeds (clear_pending_writes)
+    """
+    flush_aircraft_updates(cursor)
+    flush_flight_updates(cursor)
+    flush_alerts(cursor)
+    flush_positions(cursor)
+
+def clear_pending_writes():
+    """Empty the write buffers and the uncommitted-row tracking"""
+    touched_aircraft.clear()
+    dirty_flights.clear()
+    pending_alerts.clear()
+    triggered_alerts.clear()
+    pending_positions.clear()
+    uncommitted_aircraft.clear()
+    uncommitted_flights.clear()
+    uncommitted_photos.clear()
+
+def commit_pending_writes(db_conn, cursor):
+    """Flush the buffers and commit; the buffers are only emptied once the commit succeeds"""
+    flush_pending_writes(cursor)
+    db_conn.commit()
+    clear_pending_writes()
+
+def discard_uncommitted_writes(db_conn):
+    """
+    Roll back a failed transaction and forget everything it wrote, including
+    cache entries for aircraft and flights whose rows the rollback removed
+    (the writer then replays the transaction's messages)
+    """
+    try:
+        db_conn.rollback()
+    except Exception as e:
+        print(f"Rollback failed: {e}")
+    known_aircraft.difference_update(uncommitted_aircraft)
+    photo_url_set.difference_update(uncommitted_aircraft)
+    photo_url_set.difference_update(uncommitted_photos)
+    for icao_address in uncommitted_flights:
+        active_flights.discard(icao_address)
+    clear_pending_writes()
+
+def run_route_detection(route_conn):
+    """
+    Update routes for flights that reported a new position since the last run
+    Candidates come from the in-memory flight cache, so no query is needed to
+    find them and unchanged flights are not re-processed
+    Runs on its own pooled connection so route queries don't share the
+    position insert cursor
+    """
+    if not route_detector or not route_candidates:
+        return
+    
+    try:
+        for icao_address in route_candidates:
+            flight_info = active_flights.peek(icao_address)
+            if flight_info:
+                route_detector.update_flight_route(
+                    flight_info['flight_id'], icao_address, flight_info['callsign']
+                )
+        route_conn.commit()
+    except Exception as e:
+        print(f"Route detection error: {e}")
+        try:
+            route_conn.rollback()
+        except Exception:
+            pass
+    finally:
+        route_candidates.clear()
+
+def log_memory_usage():
+    """Log peak RSS, warning if it has gone above MEMORY_WARNING_MB"""
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # ru_maxrss is KB on Linux
+    if peak_mb > MEMORY_WARNING_MB:
+        print(f"WARNING: Peak memory {peak_mb:.0f} MB exceeds {MEMORY_WARNING_MB} MB "
+              f"(send SIGUSR1 to clear caches)")
+    else:
+        print(f"Peak memory: {peak_mb:.0f} MB")
+
+def handle_sigusr1(signum, frame):
+    """
+    Emergency memory relief: drop the caches that grow with traffic
+    (active flights, known aircraft, aircraft with photos); they refill from
+    the feed and the database. The aircraft database is kept: it is only
+    loaded at startup, so clearing it would lose registrations until restart
+    """
+    print("SIGUSR1 received - clearing memory caches")
+    callsigns_seen.clear()
+    cache_clear_requested.set()
+
+def enqueue_message(parsed):
+    """
+    Hand a parsed message to the writer thread without blocking the socket
+    If the database has stalled long enough to fill the queue, the oldest
+    message is dropped so the feed keeps being read
+    """
+    global dropped_messages
+    
+    while True:
+        try:
+            message_queue.put_nowait(parsed)
+            return
+        except queue.Full:
+            try:
+                message_queue.get_nowait()
+                dropped_messages += 1
+            except queue.Empty:
+                pass
+
+def db_writer(db_conn, cursor, route_conn):
+    """
+    Database writer thread
+    Owns the cursor and all write-side caches: stores queued messages, then
+    flushes and commits once COMMIT_ROW_THRESHOLD position rows are pending
+    or COMMIT_INTERVAL_SECONDS have passed, whichever comes first. Route
+    detection runs every ROUTE_DETECTION_INTERVAL_SECONDS and stale flight
+    cleanup every CLEANUP_INTERVAL_SECONDS. Oracle calls release the GIL,
+    so socket reads carry on while a batch is being written.
+    If a pass fails, the transaction is rolled back and every message stored
+    since the last commit is replayed (up to WRITER_MAX_RETRIES times).
+    """
+    message_count = 0
+    last_commit_time = time.time()
+    last_route_time = time.time()
+    last_cleanup_time = time.time()
+    uncommitted_messages = []  # Parsed messages stored since the last commit
+    replay = []  # Messages of a rolled-back transaction, stored again next pass
+    failures = 0  # Consecutive failed passes
+    
+    while True:
+        try:
+            if replay:
+                batch, replay = replay, []
+            else:
+                # Wait up to a second for work so periodic commits still run on a quiet feed
+                try:
+                    parsed = message_queue.get(timeout=1.0)
+                except queue.Empty:
+                    parsed = None
+                
+                batch = []
+                while parsed is not None:
+                    batch.append(parsed)
+                    if len(batch) >= WRITER_BATCH_SIZE:
+                        break
+                    try:
+                        parsed = message_queue.get_nowait()
+                    except queue.Empty:
+                        parsed = None
+            
+            if batch:
+                uncommitted_messages.extend(batch)
+                message_count += len(batch)
+                # Create all new aircraft in the batch with one MERGE call
+                ensure_aircraft_batch(cursor, batch)
+                for parsed in batch:
+                    store_position(cursor, parsed)
+            
+            stopping = writer_stop.is_set() and message_queue.empty() and not replay
+            
+            # Commit on row count or elapsed time, whichever comes first
+            # (and always before route detection, which reads on another connection)
+            current_time = time.time()
+            route_due = current_time - last_route_time > ROUTE_DETECTION_INTERVAL_SECONDS
+            if (stopping or route_due or len(pending_positions) >= COMMIT_ROW_THRESHOLD
+                    or current_time - last_commit_time > COMMIT_INTERVAL_SECONDS):
+                commit_pending_writes(db_conn, cursor)
+                uncommitted_messages.clear()
+                failures = 0
+                last_commit_time = current_time
+                
+                if stopping:
+                    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    print(f"[{timestamp}] Committed {message_count} messages to database")
+                    return
+            
+            if route_due:
+                last_route_time = current_time
+                timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                print(f"[{timestamp}] Committed {message_count} messages to database")
+                
+                # Run route detection for flights with new positions (already committed above)
+                run_route_detection(route_conn)
+                
+                # Emergency cache clear requested via SIGUSR1, after route
+                # detection has read this cycle's flights from active_flights
+                # (aircraft_db is kept; known aircraft are re-merged, which is idempotent)
+                if cache_clear_requested.is_set():
+                    cache_clear_requested.clear()
+                    active_flights.clear()
+                    known_aircraft.clear()
+                    photo_url_set.clear()
+                    print("Memory caches cleared")
+            
+            # Run cleanup periodically
+            if current_time - last_cleanup_time > CLEANUP_INTERVAL_SECONDS:
+                print("\nRunning flight cleanup...")
+                # Flushed first so end_stale_flights sees the latest last_contact
+                flush_pending_writes(cursor)
+                cleanup_stale_flights(cursor)
+                db_conn.commit()
+                clear_pending_writes()
+                uncommitted_messages.clear()
+                last_cleanup_time = current_time
+                print(f"Cleanup complete. Active flights in cache: {len(active_flights)}\n")
+                log_memory_usage()
+                
+        except Exception as e:
+            print(f"Database writer error: {e}")
+            discard_uncommitted_writes(db_conn)
+            message_count -= len(uncommitted_messages)
+            failures += 1
+            if failures <= WRITER_MAX_RETRIES:
+                print(f"Rolled back; replaying {len(uncommitted_messages)} messages")
+                replay = uncommitted_messages
+            else:
+                print(f"Rolled back; dropping {len(uncommitted_messages)} messages "
+                      f"after {failures} failed attempts")
+                failures = 0
+            uncommitted_messages = []
+            if writer_stop.is_set() and not replay:
+                return
+            time.sleep(5)
+
 def main():
     """Main collector loop"""
     print("="*80)
-    print("ADS-B Data Collector v2.2 starting...")
-    print(f"Auto-restart enabled: Will restart after {MAX_MESSAGES_BEFORE_RESTART:,} messages")
+    print("ADS-B Data Collector v2.3 starting...")
+    print(f"Memory warning threshold: {MEMORY_WARNING_MB} MB (SIGUSR1 clears caches)")
     print(f"Flight timeout: {FLIGHT_TIMEOUT_MINUTES} minutes")
     print(f"Cleanup interval: {CLEANUP_INTERVAL_SECONDS} seconds")
     print("="*80)
@@ -606,16 +1315,23 @@ def main():
     print(f"Connecting to {ADSB_HOST}:{ADSB_PORT}")
     
     # Connect to database
-    db_conn = connect_to_database()
+    db_pool = create_database_pool()
+    db_conn = db_pool.acquire()
     cursor = db_conn.cursor()
     
-    # Load airline and alert data
-    load_airline_database(cursor)
-    load_alert_rules(cursor)
+    # Load airline and alert data on a borrowed connection with array fetching
+    with db_pool.acquire() as load_conn:
+        load_cursor = bulk_cursor(load_conn)
+        load_airline_database(load_cursor)
+        load_alert_rules(load_cursor)
+        load_known_aircraft(load_cursor)
+        detect_flight_stats_columns(load_cursor)
+        load_cursor.close()
     
-    # Initialize route detector
+    # Initialize route detector on its own connection
     global route_detector
-    route_detector = RouteDetector(cursor)
+    route_conn = db_pool.acquire()
+    route_detector = RouteDetector(route_conn.cursor())
     print("Route detector initialized")
     
     # Run initial cleanup
@@ -623,12 +1339,15 @@ def main():
     cleanup_stale_flights(cursor)
     db_conn.commit()
     
+    # Start the database writer; from here on only it touches the cursor
+    writer = threading.Thread(target=db_writer, args=(db_conn, cursor, route_conn), name='db-writer', daemon=True)
+    writer.start()
+    
     # Statistics
     message_count = 0
-    last_commit_time = time.time()
-    last_cleanup_time = time.time()
-    commit_interval = 10  # Commit every 10 seconds
-    callsigns_seen = set()  # Track unique callsigns for debugging
+    
+    # Emergency cache clear
+    signal.signal(signal.SIGUSR1, handle_sigusr1)
     
     while True:
         try:
@@ -637,119 +1356,55 @@ def main():
             sock.connect((ADSB_HOST, ADSB_PORT))
             print(f"Connected to ADS-B feed at {ADSB_HOST}:{ADSB_PORT}")
             
-            buffer = ""
+            buffer = bytearray()
+            recv_buffer = bytearray(RECV_BUFFER_SIZE)
+            recv_view = memoryview(recv_buffer)
             
             while True:
-                data = sock.recv(4096).decode('utf-8', errors='ignore')
-                if not data:
-                    print("Connection closed by remote host")
-                    break
-                
-                buffer += data
-                
-                # Process complete lines
-                while '\n' in buffer:
-                    line, buffer = buffer.split('\n', 1)
+                # Wait up to a second for data
+                ready, _, _ = select.select([sock], [], [], 1.0)
+                if ready:
+                    nbytes = sock.recv_into(recv_buffer)
+                    if not nbytes:
+                        print("Connection closed by remote host")
+                        break
                     
-                    # Parse and store message
-                    parsed = parse_basestation_message(line)
-                    if parsed:
-                        # Debug: Track callsigns
-                        if parsed['callsign'] and parsed['callsign'] not in callsigns_seen:
-                            callsigns_seen.add(parsed['callsign'])
-                            print(f"New callsign detected: {parsed['callsign']} (ICAO: {parsed['icao_address']})")
-                        
-                        store_position(cursor, parsed)
-                        message_count += 1
-                        
-                        # Print progress
-                        if message_count % 1000 == 0:
-                            print(f"Processed {message_count} messages, {len(callsigns_seen)} unique callsigns, {len(active_flights)} active flights...")
-                
-                # Commit periodically
-                current_time = time.time()
-                if current_time - last_commit_time > commit_interval:
-                    db_conn.commit()
-                    last_commit_time = current_time
-                    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    print(f"[{timestamp}] Committed {message_count} messages to database")
+                    buffer += recv_view[:nbytes]
                     
-                    # Check if we've reached the restart threshold
-                    if message_count >= MAX_MESSAGES_BEFORE_RESTART:
-                        print(f"\n{'='*80}")
-                        print(f"Reached {MAX_MESSAGES_BEFORE_RESTART} messages - initiating clean restart")
-                        print(f"{'='*80}")
+                    # Process complete lines, then drop them from the buffer in one go
+                    start = 0
+                    end = buffer.find(b'\n')
+                    while end >= 0:
+                        line = buffer[start:end]
+                        start = end + 1
+                        end = buffer.find(b'\n', start)
                         
-                        # Close socket
-                        try:
-                            sock.close()
-                            print("Socket closed")
-                        except:
-                            pass
-                        
-                        # Final commit
-                        try:
-                            db_conn.commit()
-                            print("Final commit completed")
-                        except:
-                            pass
-                        
-                        # Close database connection
-                        try:
-                            cursor.close()
-                            db_conn.close()
-                            print("Database connection closed")
-                        except:
-                            pass
-                        
-                        # Clear caches to free memory
-                        active_flights.clear()
-                        aircraft_db.clear()
-                        callsigns_seen.clear()
-                        print("Memory caches cleared")
-                        
-                        print(f"Restarting collector process...")
-                        print(f"{'='*80}\n")
-                        
-                        # Restart the process
-                        os.execv(sys.executable, [sys.executable] + sys.argv)
-                    
-                    # Run route detection for active flights every commit interval
-                    if route_detector:
-                        try:
-                            cursor.execute("""
-                                SELECT DISTINCT f.flight_id, f.icao_address, f.callsign
-                                FROM flights f
-                                JOIN positions p ON f.flight_id = p.flight_id
-                                WHERE p.received_time > SYSDATE - (30/1440)
-                                  AND p.latitude IS NOT NULL
-                                  AND p.longitude IS NOT NULL
-                                  AND f.is_active = 1
-                            """)
-                            active_flights_list = cursor.fetchall()
+                        # Parse message and hand it to the writer thread
+                        parsed = parse_basestation_message(line)
+                        if parsed:
+                            # Debug: Track callsigns
+                            if parsed['callsign'] and parsed['callsign'] not in callsigns_seen:
+                                callsigns_seen.add(parsed['callsign'])
+                                print(f"New callsign detected: {parsed['callsign']} (ICAO: {parsed['icao_address']})")
                             
-                            for fid, icao, callsign in active_flights_list:
-                                route_detector.update_flight_route(fid, icao, callsign)
+                            enqueue_message(parsed)
+                            message_count += 1
                             
-                            db_conn.commit()
-                        except Exception as e:
-                            print(f"Route detection error: {e}")
+                            # Print progress
+                            if message_count % 1000 == 0:
+                                print(f"Processed {message_count} messages, {len(callsigns_seen)} unique callsigns, {len(active_flights)} active flights, {message_queue.qsize()} queued, {dropped_messages} dropped...")
+                    
+                    del buffer[:start]
                 
-                # Run cleanup periodically
-                if current_time - last_cleanup_time > CLEANUP_INTERVAL_SECONDS:
-                    print("\nRunning flight cleanup...")
-                    cleanup_stale_flights(cursor)
-                    db_conn.commit()
-                    last_cleanup_time = current_time
-                    print(f"Cleanup complete. Active flights in cache: {len(active_flights)}\n")
-            
             sock.close()
             
         except KeyboardInterrupt:
             print("\nShutting down...")
-            db_conn.commit()
+            # Let the writer drain the queue and make its final commit
+            writer_stop.set()
+            writer.join()
             cursor.close()
-            db_conn.close()
+            db_pool.close(force=True)
             sys.exit(0)
             
         except Exception as e:
@@ -3,8 +3,8 @@
 ================================================================================
 ADS-B Flight Tracker Web Application with Route Display
 ================================================================================
-Version:        2.0.0
-Last Updated:   2026-01-20
+Version:        2.1.0
+Last Updated:   2026-10-15
 Author:         ADS-B Flight Tracker Route Detection System
 Description:    Flask-based web application for visualizing ADS-B flight data
                 with automatic route detection and display.
@@ -15,7 +15,7 @@ Features:
     - Routes page: Active routes, popular routes, airport traffic stats
     - Flight History page: Historical flight data with statistics
     - Statistics page: Database stats and hourly traffic charts
-    - Auto-refresh every 10 seconds
+    - Auto-refresh every 10 seconds (current aircraft table updates in place)
     - Route display: Origin â†’ Destination with departure/ETA times
 
 Pages:
@@ -24,19 +24,111 @@ Pages:
     /routes     - Route analysis (active, popular, airport traffic)
     /history    - Flight history with statistics
     /stats      - Database statistics and charts
-    /api/aircraft - JSON API for map data
+    /api/aircraft - JSON API for map data (one array per field, row i = one aircraft)
+    /api/trails   - JSON API for map trails (several flights per request)
+    /api/current  - JSON API for the current aircraft page refresh
+    /stream/aircraft - Server-Sent Events feed of map aircraft (one open request per map)
+
+Templates (templates/):
+    base.html   - Shared page layout, styles and navigation
+    current.html, routes.html, history.html, stats.html - Pages extending base.html
+    map.html    - Live map page
+
+Static files (static/):
+    style.css   - Page styles (cached by the browser across auto-refreshes)
+    map.css     - Live map styles
+    vendor/leaflet-1.9.4/ - Optional local copy of Leaflet (leaflet.js, leaflet.css, images/)
+
+Database scripts (run once as the schema owner):
+    stats_materialized_views.sql - Route/airport materialized views and the
+                                   stats_rollup table count row
+    flight_stats_columns.sql     - Per-flight position count, max altitude and
+                                   speed totals read by /history (until it has
+                                   been run, /history aggregates positions)
+    positions_covering_index.sql - Index answering the map aircraft and hourly
+                                   stats queries without table visits
 
 Dependencies:
     - Flask: Web framework
+    - Flask-Caching: Query result and page fragment caching
+    - Flask-Compress: gzip (or brotli, if installed) response compression
+    - redis: Optional, only when CACHE_REDIS_URL is set
     - oracledb: Oracle database connectivity
-    - Leaflet.js: Interactive maps (CDN)
+    - orjson: Fast JSON encoding for the API responses
+    - gunicorn: Production WSGI server (settings in gunicorn_conf.py)
+    - Leaflet.js: Interactive maps (static/vendor/leaflet-1.9.4/ if present, else CDN)
 
 Configuration:
     - DB_USER, DB_PASSWORD, DB_DSN: Oracle connection settings
+    - DB_POOL_MIN, DB_POOL_MAX: Connection pool size (4-16)
+    - DB_POOL_WAIT_MS: Longest wait for a pooled connection when all are busy
+    - STATEMENT_CACHE_SIZE: Parsed statements cached per connection
+    - FETCH_ARRAY_SIZE: Rows fetched per database round-trip
+    - QUERY_THREADS: Threads for running a page's queries in parallel
     - RECEIVER_LAT, RECEIVER_LON: Your receiver location
+    - CACHE_REDIS_URL: Redis server for shared query caching (None = in-process)
+    - CACHE_TTL_*: How long each query's results are reused
+    - AIRCRAFT_POLL_SECONDS: How often the map aircraft snapshot is refreshed
+    - TEMPLATE_CACHE_DIR: Compiled template cache (default: a per-user temp directory;
+                          skipped if it can't be written)
     - Port: 5001 (default)
 
+Running:
+    gunicorn -c gunicorn_conf.py adsb_webapp_latest:app  (production)
+    python adsb_webapp_latest.py                         (development server)
+
 Version History:
+    2.1.0 (2026-10-15) - Page rendering performance
+        - Templates compiled once at startup instead of on every request
+        - Templates moved to templates/ with an on-disk compiled bytecode cache
+        - Single page template split into base.html plus one template per page
+        - Popular routes and airport traffic tables cached for 5 minutes
+        - Query results cached per query with TTLs matched to how fast the data changes
+        - Connection pool; session timezone set once per pooled session
+        - Map trails fetched for all new aircraft in one /api/trails request
+        - Inline CSS moved to static stylesheets so refreshes don't resend it
+        - Current aircraft page refreshes its table from /api/current instead of reloading
+        - Template whitespace stripped once at load time (smaller pages)
+        - Popular routes and airport traffic queries select only the columns shown
+        - Query cursors fetch up to 1000 rows per round-trip
+        - Current aircraft times and positions formatted once in Python, not per cell in the template
+        - Route origin/destination fallbacks resolved in the current aircraft query
+        - Responses compressed with Flask-Compress
+        - API responses encoded with orjson
+        - Static files cached by browsers for 30 days behind versioned URLs; Leaflet served locally when vendored
+        - Flight history rows built in Python rather than a template loop
+        - /api/aircraft served from a snapshot refreshed every 5 seconds by one background thread
+          (poll errors logged; a dead poller thread is restarted on the next request)
+        - ETags on the JSON APIs; unchanged polls get 304 Not Modified
+        - Template auto-reload disabled (no file checks per render)
+        - Current aircraft, routes and hourly stats rows fetched as dicts; templates use column names
+        - Map aircraft timestamps left to orjson instead of isoformat() per row
+        - Map aircraft query ranks recent positions with ROW_NUMBER() instead of grouping all positions
+        - /api/aircraft JSON encoded once per snapshot change, not once per browser poll
+        - Map receives aircraft updates pushed over Server-Sent Events instead of polling
+          (at most 4 streams per process, each reopened every 5 minutes; other maps poll)
+        - Popular routes and airport traffic read from materialized views; table counts
+          from a trigger-maintained rollup row (run stats_materialized_views.sql; until
+          then the plain views are queried)
+        - Without the rollup table, counts come from optimizer statistics, never COUNT(*)
+        - Independent queries of the current aircraft and stats pages run in parallel
+        - Pool sized 4-16 growing 2 at a time; requests wait at most 5 s for a connection
+        - Statement cache of 40 per connection; row limits and trail IN-lists bound so SQL text is reused
+        - Flight history read from per-flight totals on flights instead of aggregating positions
+        - Flight history paged 50 flights at a time with a last_contact keyset cursor
+        - Map aircraft JSON encoded batch by batch as rows are fetched; snapshot keeps only the bytes
+        - Map aircraft rows fetched as marker dicts (coordinates as binary doubles) and encoded one orjson call per batch
+        - Map aircraft sent as JSON columns (struct of arrays) instead of one object per aircraft
+        - /api/aircraft gzip-compressed once per snapshot change instead of on every poll
+        - JSON ETags are BLAKE2b content hashes; /api/aircraft's is computed once per change
+        - Stats page active aircraft counted from aircraft.last_seen, not distinct ICAOs in positions
+        - Debug mode off; production runs under gunicorn threaded workers (gunicorn_conf.py)
+        - Map page rendered once per process and revalidated by ETag
+        - Map trails sent as flat coordinate arrays, simplified in the browser and drawn on one canvas
+        - Map aircraft and hourly stats queries read from a covering positions index
+          (run positions_covering_index.sql)
+        - Map markers updated only when their position or icon changed; icons shared per rotation and colour
+    
     2.0.0 (2026-01-20) - Route detection enhancement
         - Added /routes page with active routes display
         - Origin â†’ Destination display on main page
@@ -54,775 +146,344 @@ Version History:
 ================================================================================
 """
 
-from flask import Flask, render_template_string, jsonify
+from flask import Flask, jsonify, g, request, url_for, copy_current_request_context
+from flask.json.provider import DefaultJSONProvider
+from flask_caching import Cache
+from flask_compress import Compress
+from jinja2 import BaseLoader, FileSystemBytecodeCache
+from markupsafe import Markup, escape
 import oracledb
-from datetime import datetime
+import orjson
+import gzip
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 
 app = Flask(__name__)
 
+# Templates are compiled once and kept (all page templates fit the default
+# 400 entry cache); don't stat base.html on every render, even in debug mode.
+# Restart the app after editing a template.
+app.config['TEMPLATES_AUTO_RELOAD'] = False
+
+# Compiled template bytecode cache directory (None = Jinja's per-user
+# directory under the system temp dir)
+TEMPLATE_CACHE_DIR = os.environ.get('TEMPLATE_CACHE_DIR')
+
+def template_bytecode_cache(directory):
+    """
+    On-disk cache of compiled templates, or None if the directory can't be
+    created or written (e.g. a read-only deploy); templates are then
+    compiled in memory once per process as before
+    """
+    try:
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            if not os.access(directory, os.W_OK):
+                raise PermissionError(f"{directory} is not writable")
+        return FileSystemBytecodeCache(directory)
+    except (OSError, RuntimeError) as e:
+        print(f"Template bytecode cache disabled: {e}")
+        return None
+
+app.jinja_env.bytecode_cache = template_bytecode_cache(TEMPLATE_CACHE_DIR)
+
+class MinifyingLoader(BaseLoader):
+    """
+    Wraps a template loader and strips line indentation and blank lines from
+    .html templates once, when they are loaded, so every render sends less
+    whitespace. Line breaks are kept, which keeps inline JavaScript valid.
+    """
+    def __init__(self, loader):
+        self.loader = loader
+    
+    def get_source(self, environment, template):
+        source, filename, uptodate = self.loader.get_source(environment, template)
+        if template.endswith('.html'):
+            source = '\n'.join(line.strip() for line in source.splitlines() if line.strip()) + '\n'
+        return source, filename, uptodate
+    
+    def list_templates(self):
+        return self.loader.list_templates()
+
+app.jinja_env.loader = MinifyingLoader(app.jinja_env.loader)
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    jsonify() through orjson: the API responses are lists of hundreds of
+    rows, which orjson encodes several times faster than the json module
+    """
+    # Trails are keyed by integer flight_id
+    options = orjson.OPT_NON_STR_KEYS
+    
+    def dumpb(self, obj):
+        """Encode obj to JSON bytes (what responses send)"""
+        return orjson.dumps(obj, default=self.default, option=self.options)
+    
+    def dumps(self, obj, **kwargs):
+        return self.dumpb(obj).decode()
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumpb(obj), mimetype=self.mimetype)
+
+app.json = OrjsonProvider(app)
+
 # Oracle Database Configuration - UPDATE THESE
 DB_USER = 'adsb_user'
 DB_PASSWORD = 'oracle'
 DB_DSN = 'localhost:1521/FREEPDB1'  # For Oracle 23ai Free in Docker
+DB_POOL_MIN = 4  # Pooled connections kept open (map poller + one page's parallel queries)
+DB_POOL_MAX = 16  # Upper bound on concurrent request connections
+DB_POOL_INCREMENT = 2  # Connections opened at a time when the pool grows
+DB_POOL_WAIT_MS = 5000  # How long a request waits for a free connection before failing
+STATEMENT_CACHE_SIZE = 40  # Parsed statements kept per pooled connection
+FETCH_ARRAY_SIZE = 1000  # Rows per round-trip for page and API queries
+QUERY_THREADS = 4  # Threads running a page's independent queries side by side
 
 # Your receiver location (update with your actual location)
 RECEIVER_LAT = 32.7357  # Arlington, TX
 RECEIVER_LON = -97.1081
 
-def get_db_connection():
-    """Create database connection"""
-    conn = oracledb.connect(
-        user=DB_USER,
-        password=DB_PASSWORD,
-        dsn=DB_DSN
-    )
-    
-    # Set session timezone to Central Time
-    cursor = conn.cursor()
-    cursor.execute("ALTER SESSION SET TIME_ZONE = 'America/Chicago'")
-    cursor.close()
-    
-    return conn
-
-# HTML Template
-HTML_TEMPLATE = """
-<!DOCTYPE html>
-<html>
-<head>
-    <title>ADS-B Flight Tracker</title>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <style>
-        body {
-            font-family: Arial, sans-serif;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }
-        .container {
-            max-width: 1400px;
-            margin: 0 auto;
-            background-color: white;
-            padding: 20px;
-            border-radius: 8px;
-            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-        }
-        h1 {
-            color: #333;
-            border-bottom: 3px solid #4CAF50;
-            padding-bottom: 10px;
-        }
-        .stats {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-            gap: 15px;
-            margin: 20px 0;
-        }
-        .stat-box {
-            background-color: #4CAF50;
-            color: white;
-            padding: 20px;
-            border-radius: 5px;
-            text-align: center;
-        }
-        .stat-box h3 {
-            margin: 0;
-            font-size: 2em;
-        }
-        .stat-box p {
-            margin: 5px 0 0 0;
-            opacity: 0.9;
-        }
-        table {
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 20px;
-        }
-        th {
-            background-color: #4CAF50;
-            color: white;
-            padding: 12px;
-            text-align: left;
-            position: sticky;
-            top: 0;
-        }
-        td {
-            padding: 10px;
-            border-bottom: 1px solid #ddd;
-        }
-        tr:hover {
-            background-color: #f5f5f5;
-        }
-        .refresh-info {
-            color: #666;
-            font-size: 0.9em;
-            margin-top: 10px;
-        }
-        .active {
-            color: #4CAF50;
-            font-weight: bold;
-        }
-        .altitude {
-            text-align: right;
-        }
-        .speed {
-            text-align: right;
-        }
-        button {
-            background-color: #4CAF50;
-            color: white;
-            padding: 10px 20px;
-            border: none;
-            border-radius: 4px;
-            cursor: pointer;
-            font-size: 16px;
-            margin: 10px 5px;
-        }
-        button:hover {
-            background-color: #45a049;
-        }
-        .nav {
-            margin: 20px 0;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>&#9992; ADS-B Flight Tracker</h1>
-        
-        <div class="nav">
-            <button onclick="location.href='/'">Current Aircraft</button>
-            <button onclick="location.href='/map'">Live Map</button>
-            <button onclick="location.href='/routes'">Routes</button>
-            <button onclick="location.href='/history'">Flight History</button>
-            <button onclick="location.href='/stats'">Statistics</button>
-        </div>
-        
-        {% if page == 'current' %}
-        <div class="stats">
-            <div class="stat-box">
-                <h3>{{ stats.active_aircraft }}</h3>
-                <p>Active Aircraft</p>
-            </div>
-            <div class="stat-box">
-                <h3>{{ stats.total_aircraft }}</h3>
-                <p>Total Aircraft Seen</p>
-            </div>
-            <div class="stat-box">
-                <h3>{{ stats.total_positions }}</h3>
-                <p>Position Reports</p>
-            </div>
-            <div class="stat-box">
-                <h3>{{ stats.total_flights }}</h3>
-                <p>Total Flights</p>
-            </div>
-        </div>
-        
-        <h2>Current Aircraft (Last 30 Minutes)</h2>
-        <table>
-            <thead>
-                <tr>
-                    <th>ICAO</th>
-                    <th>Registration</th>
-                    <th>Type</th>
-                    <th>Callsign</th>
-                    <th>Route</th>
-                    <th class="altitude">Altitude (ft)</th>
-                    <th class="speed">Speed (kts)</th>
-                    <th>Track</th>
-                    <th>Position</th>
-                    <th>Last Seen</th>
-                    <th>Photo</th>
-                </tr>
-            </thead>
-            <tbody>
-                {% for aircraft in current_aircraft %}
-                <tr>
-                    <td>{{ aircraft[0] }}</td>
-                    <td>{{ aircraft[1] or 'N/A' }}</td>
-                    <td>{{ aircraft[2] or 'N/A' }}</td>
-                    <td><strong>{{ aircraft[3] or 'N/A' }}</strong></td>
-                    <td>
-                        {% if aircraft[10] or aircraft[13] %}
-                            <strong>{{ aircraft[10] or aircraft[11] or '????' }}</strong> â†’ <strong>{{ aircraft[13] or aircraft[14] or '????' }}</strong>
-                            {% if aircraft[16] %}
-                                <br><small>Dep: {{ aircraft[16].strftime('%H:%M') }}</small>
-                            {% endif %}
-                            {% if aircraft[17] %}
-                                <br><small>ETA: {{ aircraft[17].strftime('%H:%M') }}</small>
-                            {% endif %}
-                        {% else %}
-                            <span style="color: #999;">Unknown</span>
-                        {% endif %}
-                    </td>
-                    <td class="altitude">{{ aircraft[4] or 'N/A' }}</td>
-                    <td class="speed">{{ aircraft[5] or 'N/A' }}</td>
-                    <td>{{ aircraft[6] or 'N/A' }}&deg;</td>
-                    <td>
-                        {% if aircraft[7] and aircraft[8] %}
-                            {{ "%.4f"|format(aircraft[7]) }}, {{ "%.4f"|format(aircraft[8]) }}
-                        {% else %}
-                            N/A
-                        {% endif %}
-                    </td>
-                    <td>
-                        <span class="{% if aircraft[9] < 5 %}active{% endif %}">
-                            {{ "%.1f"|format(aircraft[9]) }} min ago
-                        </span>
-                    </td>
-                    <td>
-                        {% if aircraft[1] %}
-                            <a href="https://www.jetphotos.com/registration/{{ aircraft[1] }}" target="_blank" style="color: #4CAF50; text-decoration: none;">&#128247; View</a>
-                        {% else %}
-                            N/A
-                        {% endif %}
-                    </td>
-                </tr>
-                {% endfor %}
-            </tbody>
-        </table>
-        
-        {% elif page == 'history' %}
-        <h2>Recent Flights</h2>
-        <table>
-            <thead>
-                <tr>
-                    <th>ICAO</th>
-                    <th>Callsign</th>
-                    <th>First Contact</th>
-                    <th>Last Contact</th>
-                    <th>Duration</th>
-                    <th>Positions</th>
-                    <th>Max Alt (ft)</th>
-                    <th>Avg Speed (kts)</th>
-                </tr>
-            </thead>
-            <tbody>
-                {% for flight in flights %}
-                <tr>
-                    <td>{{ flight[0] }}</td>
-                    <td><strong>{{ flight[1] or 'N/A' }}</strong></td>
-                    <td>{{ flight[2].strftime('%Y-%m-%d %H:%M:%S') if flight[2] else 'N/A' }}</td>
-                    <td>{{ flight[3].strftime('%Y-%m-%d %H:%M:%S') if flight[3] else 'N/A' }}</td>
-                    <td>
-                        {% if flight[2] and flight[3] %}
-                            {{ "%.1f"|format((flight[3] - flight[2]).total_seconds() / 60) }} min
-                        {% else %}
-                            N/A
-                        {% endif %}
-                    </td>
-                    <td>{{ flight[4] }}</td>
-                    <td class="altitude">{{ flight[5] or 'N/A' }}</td>
-                    <td class="speed">{{ "%.0f"|format(flight[6]) if flight[6] else 'N/A' }}</td>
-                </tr>
-                {% endfor %}
-            </tbody>
-        </table>
-        
-        {% elif page == 'routes' %}
-        <h2>Active Routes (Last Hour)</h2>
-        <table>
-            <thead>
-                <tr>
-                    <th>Callsign</th>
-                    <th>Aircraft</th>
-                    <th>Origin</th>
-                    <th>Destination</th>
-                    <th>Distance (nm)</th>
-                    <th>Departed</th>
-                    <th>ETA</th>
-                    <th>Max Alt (ft)</th>
-                    <th>Avg Speed (kts)</th>
-                </tr>
-            </thead>
-            <tbody>
-                {% for route in current_routes %}
-                <tr>
-                    <td><strong>{{ route[1] or route[0] }}</strong></td>
-                    <td>{{ route[2] or 'N/A' }}<br><small>{{ route[3] or '' }}</small></td>
-                    <td>
-                        {% if route[4] or route[5] %}
-                            <strong>{{ route[4] or route[5] }}</strong><br>
-                            <small>{{ route[6] or '' }}{% if route[7] %}, {{ route[7] }}{% endif %}</small>
-                        {% else %}
-                            <span style="color: #999;">Unknown</span>
-                        {% endif %}
-                    </td>
-                    <td>
-                        {% if route[8] or route[9] %}
-                            <strong>{{ route[8] or route[9] }}</strong><br>
-                            <small>{{ route[10] or '' }}{% if route[11] %}, {{ route[11] }}{% endif %}</small>
-                        {% else %}
-                            <span style="color: #999;">Unknown</span>
-                        {% endif %}
-                    </td>
-                    <td class="altitude">{{ route[14] or 'N/A' }}</td>
-                    <td>{{ route[12].strftime('%H:%M') if route[12] else 'N/A' }}</td>
-                    <td>{{ route[13].strftime('%H:%M') if route[13] else 'N/A' }}</td>
-                    <td class="altitude">{{ "{:,}".format(route[15]) if route[15] else 'N/A' }}</td>
-                    <td class="speed">{{ "%.0f"|format(route[16]) if route[16] else 'N/A' }}</td>
-                </tr>
-                {% endfor %}
-            </tbody>
-        </table>
-        
-        <h2>Popular Routes (Last 30 Days)</h2>
-        <table>
-            <thead>
-                <tr>
-                    <th>Route</th>
-                    <th>Origin</th>
-                    <th>Destination</th>
-                    <th>Flights</th>
-                    <th>Aircraft</th>
-                    <th>Distance (nm)</th>
-                    <th>First Seen</th>
-                    <th>Last Seen</th>
-                </tr>
-            </thead>
-            <tbody>
-                {% for route in popular_routes %}
-                <tr>
-                    <td><strong>{{ route[0] }}</strong></td>
-                    <td>
-                        <strong>{{ route[1] or route[2] }}</strong><br>
-                        <small>{{ route[3] }}{% if route[4] %}, {{ route[4] }}{% endif %}</small>
-                    </td>
-                    <td>
-                        <strong>{{ route[5] or route[6] }}</strong><br>
-                        <small>{{ route[7] }}{% if route[8] %}, {{ route[8] }}{% endif %}</small>
-                    </td>
-                    <td>{{ route[9] }}</td>
-                    <td>{{ route[10] }}</td>
-                    <td class="altitude">{{ route[11] or 'N/A' }}</td>
-                    <td>{{ route[12].strftime('%Y-%m-%d') if route[12] else 'N/A' }}</td>
-                    <td>{{ route[13].strftime('%Y-%m-%d') if route[13] else 'N/A' }}</td>
-                </tr>
-                {% endfor %}
-            </tbody>
-        </table>
-        
-        <h2>Airport Traffic (Last 7 Days)</h2>
-        <table>
-            <thead>
-                <tr>
-                    <th>Airport</th>
-                    <th>Location</th>
-                    <th>Departures</th>
-                    <th>Arrivals</th>
-                    <th>Total Traffic</th>
-                </tr>
-            </thead>
-            <tbody>
-                {% for airport in airport_traffic %}
-                <tr>
-                    <td><strong>{{ airport[1] or airport[2] }}</strong><br><small>{{ airport[3] }}</small></td>
-                    <td>{{ airport[4] }}, {{ airport[5] }}</td>
-                    <td>{{ airport[6] }}</td>
-                    <td>{{ airport[7] }}</td>
-                    <td><strong>{{ airport[8] }}</strong></td>
-                </tr>
-                {% endfor %}
-            </tbody>
-        </table>
-        
-        {% elif page == 'stats' %}
-        <h2>Database Statistics</h2>
-        <div class="stats">
-            <div class="stat-box">
-                <h3>{{ stats.total_aircraft }}</h3>
-                <p>Unique Aircraft</p>
-            </div>
-            <div class="stat-box">
-                <h3>{{ stats.total_flights }}</h3>
-                <p>Total Flights</p>
-            </div>
-            <div class="stat-box">
-                <h3>{{ stats.total_positions }}</h3>
-                <p>Position Reports</p>
-            </div>
-            <div class="stat-box">
-                <h3>{{ stats.active_aircraft }}</h3>
-                <p>Active (30 min)</p>
-            </div>
-        </div>
-        
-        <h3>Recent Activity</h3>
-        <table>
-            <thead>
-                <tr>
-                    <th>Hour</th>
-                    <th>Aircraft Count</th>
-                    <th>Position Reports</th>
-                </tr>
-            </thead>
-            <tbody>
-                {% for hour in hourly_stats %}
-                <tr>
-                    <td>{{ hour[0].strftime('%Y-%m-%d %H:00') if hour[0] else 'N/A' }}</td>
-                    <td>{{ hour[1] }}</td>
-                    <td>{{ hour[2] }}</td>
-                </tr>
-                {% endfor %}
-            </tbody>
-        </table>
-        {% endif %}
-        
-        <p class="refresh-info">Page auto-refreshes every 10 seconds</p>
-    </div>
-    
-    <script>
-        // Auto-refresh every 10 seconds
-        setTimeout(function() {
-            location.reload();
-        }, 10000);
-    </script>
-</body>
-</html>
-"""
+# Query result cache - set CACHE_REDIS_URL (e.g. 'redis://localhost:6379/0') to
+# share cached results between worker processes; None uses an in-process cache
+CACHE_REDIS_URL = None
 
-# Map Template
-MAP_TEMPLATE = """
-<!DOCTYPE html>
-<html>
-<head>
-    <title>ADS-B Live Map</title>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <link rel="stylesheet" href="https://unpkg.com/leaflet@1.9.4/dist/leaflet.css" />
-    <script src="https://unpkg.com/leaflet@1.9.4/dist/leaflet.js"></script>
-    <style>
-        body {
-            font-family: Arial, sans-serif;
-            margin: 0;
-            padding: 0;
-        }
-        .header {
-            background-color: #4CAF50;
-            color: white;
-            padding: 10px 20px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }
-        .nav {
-            display: flex;
-            gap: 10px;
-        }
-        button {
-            background-color: white;
-            color: #4CAF50;
-            padding: 8px 16px;
-            border: none;
-            border-radius: 4px;
-            cursor: pointer;
-            font-size: 14px;
-        }
-        button:hover {
-            background-color: #f0f0f0;
-        }
-        #map {
-            height: calc(100vh - 120px);
-            width: 100%;
-        }
-        .stats {
-            background-color: #f5f5f5;
-            padding: 10px 20px;
-            display: flex;
-            gap: 30px;
-            border-top: 1px solid #ddd;
-        }
-        .stat-item {
-            font-size: 14px;
-        }
-        .stat-value {
-            font-weight: bold;
-            color: #4CAF50;
-            font-size: 18px;
-        }
-        .aircraft-icon {
-            font-size: 20px;
-            transition: transform 0.3s;
-        }
-        .popup-content {
-            min-width: 200px;
-        }
-        .popup-content h3 {
-            margin: 0 0 10px 0;
-            color: #4CAF50;
-        }
-        .popup-content table {
-            width: 100%;
-            font-size: 12px;
-        }
-        .popup-content td {
-            padding: 3px 5px;
-        }
-        .popup-content td:first-child {
-            font-weight: bold;
-            width: 40%;
-        }
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>&#9992; ADS-B Live Map</h1>
-        <div class="nav">
-            <button onclick="location.href='/'">Current Aircraft</button>
-            <button onclick="location.href='/map'">Live Map</button>
-            <button onclick="location.href='/history'">Flight History</button>
-            <button onclick="location.href='/stats'">Statistics</button>
-            <button onclick="toggleTrails()" id="trail-toggle">Hide Trails</button>
-        </div>
-    </div>
-    
-    <div id="map"></div>
-    
-    <div class="stats">
-        <div class="stat-item">
-            <div class="stat-value" id="aircraft-count">0</div>
-            <div>Aircraft Tracked</div>
-        </div>
-        <div class="stat-item">
-            <div class="stat-value" id="update-time">--:--:--</div>
-            <div>Last Update</div>
-        </div>
-        <div class="stat-item">
-            <div class="stat-value" id="altitude-range">0 - 0 ft</div>
-            <div>Altitude Range</div>
-        </div>
-    </div>
-    
-    <script>
-        // Initialize map centered on your receiver location
-        const RECEIVER_LAT = """ + str(RECEIVER_LAT) + """;
-        const RECEIVER_LON = """ + str(RECEIVER_LON) + """;
-        
-        const map = L.map('map').setView([RECEIVER_LAT, RECEIVER_LON], 10);
-        
-        // Add OpenStreetMap tiles
-        L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
-            attribution: 'Â© OpenStreetMap contributors',
-            maxZoom: 19
-        }).addTo(map);
-        
-        // Add receiver marker
-        const receiverIcon = L.divIcon({
-            html: '<div style="font-size: 24px;">ðŸ“¡</div>',
-            className: 'receiver-icon',
-            iconSize: [30, 30],
-            iconAnchor: [15, 15]
-        });
-        
-        L.marker([RECEIVER_LAT, RECEIVER_LON], {icon: receiverIcon})
-            .bindPopup('<b>ADS-B Receiver</b><br>Arlington, TX')
-            .addTo(map);
-        
-        // Store aircraft markers and trails
-        let aircraftMarkers = {};
-        let aircraftTrails = {};
-        let showTrails = true;  // Toggle for showing/hiding trails
-        
-        // Function to get color based on altitude
-        function getAltitudeColor(altitude) {
-            if (!altitude) return '#808080';
-            if (altitude < 5000) return '#ff4444';
-            if (altitude < 15000) return '#ff8800';
-            if (altitude < 25000) return '#ffcc00';
-            if (altitude < 35000) return '#88cc00';
-            return '#0088ff';
-        }
-        
-        // Function to create aircraft icon with rotation
-        function createAircraftIcon(track, altitude) {
-            const color = getAltitudeColor(altitude);
-            const rotation = track || 0;
-            return L.divIcon({
-                html: `<div style="transform: rotate(${rotation}deg); font-size: 34px; color: ${color};">&#9992;</div>`,
-                className: 'aircraft-icon',
-                iconSize: [24, 24],
-                iconAnchor: [12, 12]
-            });
-        }
-        
-        // Function to create popup content
-        function createPopup(aircraft) {
-            let html = '<div class="popup-content">';
-            html += `<h3>${aircraft.callsign || aircraft.icao}</h3>`;
-            html += '<table>';
-            if (aircraft.registration) html += `<tr><td>Registration:</td><td>${aircraft.registration}</td></tr>`;
-            if (aircraft.type) html += `<tr><td>Type:</td><td>${aircraft.type}</td></tr>`;
-            if (aircraft.operator) html += `<tr><td>Operator:</td><td>${aircraft.operator}</td></tr>`;
-            html += `<tr><td>ICAO:</td><td>${aircraft.icao}</td></tr>`;
-            if (aircraft.altitude) html += `<tr><td>Altitude:</td><td>${aircraft.altitude.toLocaleString()} ft</td></tr>`;
-            if (aircraft.speed) html += `<tr><td>Speed:</td><td>${aircraft.speed} kts</td></tr>`;
-            if (aircraft.track) html += `<tr><td>Track:</td><td>${aircraft.track}&deg;</td></tr>`;
-            if (aircraft.squawk) html += `<tr><td>Squawk:</td><td>${aircraft.squawk}</td></tr>`;
-            html += '</table></div>';
-            return html;
-        }
-        
-        // Function to fetch and draw flight trail
-        function updateTrail(aircraft) {
-            if (!showTrails || !aircraft.flight_id) return;
-            
-            fetch(`/api/trail/${aircraft.flight_id}`)
-                .then(response => response.json())
-                .then(trail => {
-                    if (trail.length < 2) return;  // Need at least 2 points for a line
-                    
-                    // Remove old trail if exists
-                    if (aircraftTrails[aircraft.icao]) {
-                        map.removeLayer(aircraftTrails[aircraft.icao]);
-                    }
-                    
-                    // Create array of lat/lon pairs
-                    const coords = trail.map(point => [point.lat, point.lon]);
-                    
-                    // Create polyline with color based on altitude
-                    const color = getAltitudeColor(aircraft.altitude);
-                    const polyline = L.polyline(coords, {
-                        color: color,
-                        weight: 2,
-                        opacity: 0.6,
-                        smoothFactor: 1
-                    }).addTo(map);
-                    
-                    // Store trail
-                    aircraftTrails[aircraft.icao] = polyline;
-                    
-                    console.log(`Drew trail for ${aircraft.icao}: ${trail.length} points`);
-                })
-                .catch(error => console.error(`Error fetching trail for ${aircraft.icao}:`, error));
-        }
-        
-        // Function to update aircraft on map
-        function updateAircraft() {
-            fetch('/api/aircraft')
-                .then(response => response.json())
-                .then(data => {
-                    console.log('Received aircraft data:', data.length, 'aircraft');
-                    
-                    const currentIcaos = new Set();
-                    let minAlt = Infinity;
-                    let maxAlt = -Infinity;
-                    
-                    // Update or create markers for each aircraft
-                    data.forEach(aircraft => {
-                        console.log('Processing aircraft:', aircraft.icao, 'Lat:', aircraft.lat, 'Lon:', aircraft.lon);
-                        
-                        if (!aircraft.lat || !aircraft.lon) {
-                            console.warn('Aircraft missing coordinates:', aircraft.icao);
-                            return;
-                        }
-                        
-                        currentIcaos.add(aircraft.icao);
-                        
-                        // Track altitude range
-                        if (aircraft.altitude) {
-                            minAlt = Math.min(minAlt, aircraft.altitude);
-                            maxAlt = Math.max(maxAlt, aircraft.altitude);
-                        }
-                        
-                        const icon = createAircraftIcon(aircraft.track, aircraft.altitude);
-                        
-                        if (aircraftMarkers[aircraft.icao]) {
-                            // Update existing marker
-                            const marker = aircraftMarkers[aircraft.icao];
-                            marker.setLatLng([aircraft.lat, aircraft.lon]);
-                            marker.setIcon(icon);
-                            marker.setPopupContent(createPopup(aircraft));
-                            console.log('Updated marker for:', aircraft.icao);
-                        } else {
-                            // Create new marker
-                            const marker = L.marker([aircraft.lat, aircraft.lon], {icon: icon})
-                                .bindPopup(createPopup(aircraft))
-                                .addTo(map);
-                            aircraftMarkers[aircraft.icao] = marker;
-                            console.log('Created new marker for:', aircraft.icao, 'at', aircraft.lat, aircraft.lon);
-                            
-                            // Fetch and draw trail for new aircraft
-                            updateTrail(aircraft);
-                        }
-                    });
-                    
-                    console.log('Total markers on map:', Object.keys(aircraftMarkers).length);
-                    
-                    // Remove markers for aircraft no longer present
-                    Object.keys(aircraftMarkers).forEach(icao => {
-                        if (!currentIcaos.has(icao)) {
-                            map.removeLayer(aircraftMarkers[icao]);
-                            delete aircraftMarkers[icao];
-                            
-                            // Also remove trail
-                            if (aircraftTrails[icao]) {
-                                map.removeLayer(aircraftTrails[icao]);
-                                delete aircraftTrails[icao];
-                            }
-                            
-                            console.log('Removed marker for:', icao);
-                        }
-                    });
-                    
-                    // Update statistics
-                    document.getElementById('aircraft-count').textContent = data.length;
-                    document.getElementById('update-time').textContent = new Date().toLocaleTimeString();
-                    
-                    if (minAlt !== Infinity && maxAlt !== -Infinity) {
-                        document.getElementById('altitude-range').textContent = 
-                            `${minAlt.toLocaleString()} - ${maxAlt.toLocaleString()} ft`;
-                    }
-                })
-                .catch(error => {
-                    console.error('Error fetching aircraft:', error);
-                });
-        }
-        
-        // Toggle trails on/off
-        function toggleTrails() {
-            showTrails = !showTrails;
-            const button = document.getElementById('trail-toggle');
-            
-            if (showTrails) {
-                button.textContent = 'Hide Trails';
-                // Reload all trails
-                fetch('/api/aircraft')
-                    .then(response => response.json())
-                    .then(data => {
-                        data.forEach(aircraft => {
-                            if (aircraft.lat && aircraft.lon) {
-                                updateTrail(aircraft);
-                            }
-                        });
-                    });
-            } else {
-                button.textContent = 'Show Trails';
-                // Remove all trails
-                Object.values(aircraftTrails).forEach(trail => {
-                    map.removeLayer(trail);
-                });
-                aircraftTrails = {};
-            }
-        }
-        
-        // Initial update
-        updateAircraft();
-        
-        // Update every 5 seconds
-        setInterval(updateAircraft, 5000);
-    </script>
-</body>
-</html>
-"""
+# How long each query's results are reused (seconds)
+CACHE_TTL_CURRENT = 5  # Current aircraft, active routes, map positions
+CACHE_TTL_TOTALS = 30  # Table counts and active aircraft count
+CACHE_TTL_HISTORY = 30  # Flight history
+CACHE_TTL_HOURLY = 60  # Hourly traffic
+CACHE_TTL_POPULAR_ROUTES = 600  # Popular routes (last 30 days)
+CACHE_TTL_AIRPORT_TRAFFIC = 3600  # Airport traffic (last 7 days)
 
-@app.route('/')
-def index():
-    """Display current aircraft"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get current aircraft from view with route information
-    cursor.execute("""
+# Map trails
+TRAIL_MINUTES = 60  # How much history each trail shows
+MAX_TRAIL_FLIGHTS = 500  # Flights per /api/trails request (Oracle IN-list limit is 1000)
+
+# Rows shown in the capped tables (bound as :lim; changing them needs no new statement)
+POPULAR_ROUTES_ROWS = 20
+AIRPORT_TRAFFIC_ROWS = 15
+HISTORY_ROWS = 50  # Flights per history page (?limit= overrides, up to HISTORY_MAX_ROWS)
+HISTORY_MAX_ROWS = 200
+
+# Map aircraft are queried by one background thread and shared by all browsers
+AIRCRAFT_POLL_SECONDS = 5
+
+# Each open map's /stream/aircraft holds one server thread (gunicorn_conf.py
+# threads) while it is open. Beyond STREAM_MAX_CLIENTS per process the stream
+# returns 503 and the map polls /api/aircraft instead, so page and API
+# requests keep free threads; streams end after STREAM_MAX_SECONDS and the
+# browser reconnects (to whichever worker accepts it)
+STREAM_MAX_CLIENTS = 4
+STREAM_MAX_SECONDS = 300
+
+# Leaflet is served from static/vendor/leaflet-<version>/ when that directory exists
+# (copy leaflet.js, leaflet.css and images/ from the Leaflet dist download),
+# otherwise from the unpkg CDN
+LEAFLET_VERSION = '1.9.4'
+STATIC_MAX_AGE = 30 * 24 * 3600  # Browser cache lifetime for static files (URLs are versioned)
+
+# Query results and slow-changing page fragments ({% cache %} in templates)
+if CACHE_REDIS_URL:
+    cache = Cache(app, config={'CACHE_TYPE': 'RedisCache', 'CACHE_REDIS_URL': CACHE_REDIS_URL,
+                               'CACHE_KEY_PREFIX': 'adsb:', 'CACHE_DEFAULT_TIMEOUT': 300})
+else:
+    cache = Cache(app, config={'CACHE_TYPE': 'SimpleCache', 'CACHE_DEFAULT_TIMEOUT': 300})
+
+# Compress pages, JSON and stylesheets (the 10 second refreshes resend mostly table markup)
+app.config['COMPRESS_MIMETYPES'] = ['text/html', 'application/json', 'text/css', 'application/javascript']
+app.config['COMPRESS_LEVEL'] = 6
+app.config['COMPRESS_MIN_SIZE'] = 500
+Compress(app)
+
+# Static file URLs carry the file's modification time, so browsers can keep
+# them for STATIC_MAX_AGE and still pick up edits immediately
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = STATIC_MAX_AGE
+static_versions = {}
+
+@app.template_global()
+def static_url(filename):
+    """URL for a file in static/ with a cache-busting version parameter"""
+    version = static_versions.get(filename)
+    if version is None:
+        version = int(os.path.getmtime(os.path.join(app.static_folder, filename)))
+        static_versions[filename] = version
+    return url_for('static', filename=filename, v=version)
+
+LEAFLET_DIR = f'vendor/leaflet-{LEAFLET_VERSION}'
+LEAFLET_LOCAL = os.path.exists(os.path.join(app.static_folder, LEAFLET_DIR, 'leaflet.js'))
+
+@app.template_global()
+def leaflet_url(filename):
+    """URL for a Leaflet file: the local copy if present, otherwise unpkg"""
+    if LEAFLET_LOCAL:
+        return url_for('static', filename=f'{LEAFLET_DIR}/{filename}')
+    return f'https://unpkg.com/leaflet@{LEAFLET_VERSION}/dist/{filename}'
+
+def init_session(connection, requested_tag):
+    """Pool session callback: set session timezone to Central Time on new sessions only"""
+    with connection.cursor() as cursor:
+        cursor.execute("ALTER SESSION SET TIME_ZONE = 'America/Chicago'")
+
+# Connection pool shared by all request threads (no connect or ALTER SESSION per request)
+POOL = oracledb.create_pool(
+    user=DB_USER,
+    password=DB_PASSWORD,
+    dsn=DB_DSN,
+    min=DB_POOL_MIN,
+    max=DB_POOL_MAX,
+    increment=DB_POOL_INCREMENT,
+    getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+    wait_timeout=DB_POOL_WAIT_MS,
+    stmtcachesize=STATEMENT_CACHE_SIZE,
+    session_callback=init_session
+)
+
+def get_db():
+    """Pooled connection for the current request, borrowed on first use"""
+    if 'db' not in g:
+        g.db = POOL.acquire()
+    return g.db
+
+@app.teardown_appcontext
+def close_db(exception):
+    """Return the request's connection to the pool, if one was borrowed"""
+    conn = g.pop('db', None)
+    if conn is not None:
+        POOL.release(conn)
+
+# Shared by all requests; each task borrows its own pooled connection
+query_executor = ThreadPoolExecutor(max_workers=QUERY_THREADS, thread_name_prefix='query')
+
+def in_parallel(*calls):
+    """
+    Run independent query functions concurrently and return their results in order
+    Each call gets a copy of the request context, so get_db() borrows a separate
+    pooled connection for it (returned when the call finishes); a page's cache
+    misses then cost one round-trip of wall time instead of one per query
+    """
+    futures = [query_executor.submit(copy_current_request_context(call)) for call in calls]
+    return [future.result() for future in futures]
+
+def query_cursor(connection=None):
+    """
+    Cursor tuned for multi-row results, on the request connection by default
+    Prefetching one row past the array size lets a result that fits in one
+    batch complete in a single round-trip
+    """
+    cursor = (connection or get_db()).cursor()
+    cursor.arraysize = FETCH_ARRAY_SIZE
+    cursor.prefetchrows = FETCH_ARRAY_SIZE + 1
+    return cursor
+
+def dict_rows(cursor):
+    """Make the cursor return rows as dicts keyed by lowercase column name"""
+    columns = [column[0].lower() for column in cursor.description]
+    cursor.rowfactory = lambda *row: dict(zip(columns, row))
+
+def float_coordinates(cursor, metadata):
+    """
+    Output type handler: fetch scaled NUMBER columns (latitude/longitude) as
+    BINARY_DOUBLE, so the database sends IEEE doubles that the driver copies
+    straight into Python floats instead of parsing Oracle decimal numbers
+    """
+    if metadata.type_code is oracledb.DB_TYPE_NUMBER and metadata.scale and metadata.scale > 0:
+        return cursor.var(oracledb.DB_TYPE_BINARY_DOUBLE, arraysize=cursor.arraysize)
+
+def cached_query(key, ttl, sql, as_dicts=False, input_sizes=None, **params):
+    """
+    Return all rows for sql, reusing the cached result for ttl seconds
+    Concurrent page loads within the TTL share one database round-trip
+    With as_dicts, rows are dicts so templates can use column names
+    input_sizes: bind types passed to setinputsizes (e.g. TIMESTAMP binds)
+    """
+    rows = cache.get(key)
+    if rows is None:
+        with query_cursor() as cursor:
+            if input_sizes:
+                cursor.setinputsizes(**input_sizes)
+            cursor.execute(sql, params)
+            if as_dicts:
+                dict_rows(cursor)
+            rows = cursor.fetchall()
+        cache.set(key, rows, timeout=ttl)
+    return rows
+
+# Set once stats_rollup is found missing, so later calls go straight to the
+# optimizer row counts instead of repeating the failing query
+# (restart after running stats_materialized_views.sql)
+stats_rollup_missing = False
+
+# Materialized views found missing, so later calls go straight to the view
+# they are built from (restart after running stats_materialized_views.sql)
+missing_materialized_views = set()
+
+def materialized_view_query(key, ttl, view, source_view, sql, **params):
+    """
+    cached_query() against a materialized view, substituted for {source}
+    in sql; until stats_materialized_views.sql has created it, query the
+    plain view it is built from instead
+    """
+    if view not in missing_materialized_views:
+        try:
+            return cached_query(key, ttl, sql.format(source=view), **params)
+        except oracledb.DatabaseError as e:
+            # ORA-00942 (table or view does not exist)
+            error, = e.args
+            if error.code != 942:
+                raise
+            print(f"{view} not found; querying {source_view} "
+                  "(run stats_materialized_views.sql)")
+            missing_materialized_views.add(view)
+    return cached_query(f'{key}:{source_view}', ttl, sql.format(source=source_view), **params)
+
+def get_totals():
+    """
+    Row counts for the aircraft, flights and positions tables
+    Read from the trigger-maintained stats_rollup row (stats_materialized_views.sql);
+    until that script has been run, use the optimizer statistics row counts
+    (approximate, as of the last DBMS_STATS gather) rather than COUNT(*) scans
+    """
+    global stats_rollup_missing
+    if not stats_rollup_missing:
+        try:
+            return dict(cached_query('totals', CACHE_TTL_TOTALS, """
+                SELECT total_aircraft, total_flights, total_positions
+                FROM stats_rollup
+            """, as_dicts=True)[0])
+        except oracledb.DatabaseError as e:
+            # Only ORA-00942 (table or view does not exist) is remembered;
+            # other errors fall back for this call alone
+            error, = e.args
+            if error.code == 942:
+                print("stats_rollup not found; using optimizer row counts "
+                      "(run stats_materialized_views.sql)")
+                stats_rollup_missing = True
+    totals = cached_query('totals_num_rows', CACHE_TTL_TOTALS, """
+        SELECT
+            MAX(CASE table_name WHEN 'AIRCRAFT' THEN num_rows END) as total_aircraft,
+            MAX(CASE table_name WHEN 'FLIGHTS' THEN num_rows END) as total_flights,
+            MAX(CASE table_name WHEN 'POSITIONS' THEN num_rows END) as total_positions
+        FROM user_tables
+        WHERE table_name IN ('AIRCRAFT', 'FLIGHTS', 'POSITIONS')
+    """, as_dicts=True)[0]
+    return dict(totals)
+
+# Compile templates once at startup; the compiled code is also cached on disk
+# so later processes skip Jinja's compile step entirely
+CURRENT_PAGE = app.jinja_env.get_template('current.html')
+HISTORY_PAGE = app.jinja_env.get_template('history.html')
+ROUTES_PAGE = app.jinja_env.get_template('routes.html')
+STATS_PAGE = app.jinja_env.get_template('stats.html')
+MAP_PAGE = app.jinja_env.get_template('map.html')
+
+def get_current_aircraft():
+    """Current aircraft from view with route information"""
+    return cached_query('current_aircraft', CACHE_TTL_CURRENT, """
         SELECT 
             ca.icao_address,
             ca.registration,
@@ -834,12 +495,10 @@ def index():
             ca.latitude,
             ca.longitude,
             ca.minutes_ago,
-            origin.icao_code as origin_icao,
-            origin.iata_code as origin_iata,
-            origin.airport_name as origin_name,
-            dest.icao_code as dest_icao,
-            dest.iata_code as dest_iata,
-            dest.airport_name as dest_name,
+            NVL(origin.icao_code, NVL(origin.iata_code, '????')) as origin_disp,
+            NVL(dest.icao_code, NVL(dest.iata_code, '????')) as dest_disp,
+            CASE WHEN origin.icao_code IS NOT NULL OR dest.icao_code IS NOT NULL
+                 THEN 1 ELSE 0 END as has_route,
             fr.actual_departure,
             fr.estimated_arrival
         FROM v_current_aircraft ca
@@ -849,45 +508,81 @@ def index():
         LEFT JOIN airports origin ON fr.origin_airport_id = origin.airport_id
         LEFT JOIN airports dest ON fr.dest_airport_id = dest.airport_id
         ORDER BY ca.minutes_ago ASC
-    """)
-    current_aircraft = cursor.fetchall()
-    
-    # Get statistics
-    cursor.execute("SELECT COUNT(*) FROM aircraft")
-    total_aircraft = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM flights")
-    total_flights = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM positions")
-    total_positions = cursor.fetchone()[0]
+    """, as_dicts=True)
+
+def format_aircraft(row):
+    """
+    Display values for one current aircraft row, formatted once here
+    rather than through Jinja filters for every cell on every render
+    """
+    return {
+        'icao': row['icao_address'],
+        'registration': row['registration'],
+        'type': row['aircraft_type'],
+        'callsign': row['callsign'],
+        'has_route': row['has_route'],
+        'origin': row['origin_disp'],
+        'dest': row['dest_disp'],
+        'dep': row['actual_departure'].strftime('%H:%M') if row['actual_departure'] else None,
+        'eta': row['estimated_arrival'].strftime('%H:%M') if row['estimated_arrival'] else None,
+        'altitude': row['altitude'],
+        'speed': row['ground_speed'],
+        'track': row['track'],
+        'position': (f"{row['latitude']:.4f}, {row['longitude']:.4f}"
+                     if row['latitude'] and row['longitude'] else 'N/A'),
+        'minutes_ago': f"{row['minutes_ago']:.1f}",
+        'recent': row['minutes_ago'] < 5
+    }
+
+def content_etag(body):
+    """
+    ETag for response bytes: a 64-bit BLAKE2b digest (cheaper than werkzeug's
+    SHA-1, and the same in every worker process for the same body)
+    """
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+@app.after_request
+def add_api_etag(response):
+    """
+    Content ETag on JSON API responses so a browser polling unchanged data
+    gets 304 Not Modified instead of the same body again
+    (weak, so it survives Flask-Compress re-encoding the body)
+    """
+    if (request.method == 'GET' and response.status_code == 200
+            and response.mimetype == 'application/json' and 'ETag' not in response.headers):
+        response.set_etag(content_etag(response.get_data()), weak=True)
+        response.cache_control.no_cache = True
+        response.make_conditional(request)
+    return response
+
+@app.route('/')
+def index():
+    """Display current aircraft"""
+    rows, stats = in_parallel(get_current_aircraft, get_totals)
+    current_aircraft = [format_aircraft(row) for row in rows]
     
     # Active aircraft is simply the count from the view
-    active_aircraft = len(current_aircraft)
+    stats['active_aircraft'] = len(current_aircraft)
     
-    stats = {
-        'total_aircraft': total_aircraft,
-        'total_flights': total_flights,
-        'total_positions': total_positions,
-        'active_aircraft': active_aircraft
-    }
-    
-    cursor.close()
-    conn.close()
+    return CURRENT_PAGE.render(current_aircraft=current_aircraft,
+                               stats=stats)
+
+@app.route('/api/current')
+@cache.cached(timeout=CACHE_TTL_CURRENT)
+def api_current():
+    """API endpoint for the current aircraft page's in-place refresh (JSON)"""
+    rows, stats = in_parallel(get_current_aircraft, get_totals)
+    current_aircraft = [format_aircraft(row) for row in rows]
+    stats['active_aircraft'] = len(current_aircraft)
     
-    return render_template_string(HTML_TEMPLATE, 
-                                 page='current',
-                                 current_aircraft=current_aircraft,
-                                 stats=stats)
+    # Same display values as the page table
+    return jsonify({'stats': stats, 'aircraft': current_aircraft})
 
 @app.route('/routes')
 def routes():
     """Display detected routes"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     # Get current active routes
-    cursor.execute("""
+    current_routes = cached_query('current_routes', CACHE_TTL_CURRENT, """
         SELECT 
             icao_address,
             callsign,
@@ -910,194 +605,475 @@ def routes():
         WHERE (origin_icao IS NOT NULL OR dest_icao IS NOT NULL)
           AND last_contact > SYSDATE - (60/1440)
         ORDER BY last_contact DESC
-    """)
-    current_routes = cursor.fetchall()
+    """, as_dicts=True)
     
     # Get popular routes
-    cursor.execute("""
-        SELECT * FROM v_popular_routes_enhanced
-        FETCH FIRST 20 ROWS ONLY
-    """)
-    popular_routes = cursor.fetchall()
+    def popular_routes():
+        return materialized_view_query('popular_routes', CACHE_TTL_POPULAR_ROUTES,
+                                       'mv_popular_routes', 'v_popular_routes_enhanced', """
+            SELECT 
+                route_code,
+                origin_icao,
+                origin_iata,
+                origin_name,
+                origin_city,
+                dest_icao,
+                dest_iata,
+                dest_name,
+                dest_city,
+                flight_count,
+                unique_aircraft,
+                avg_distance_nm,
+                first_seen,
+                last_seen
+            FROM {source}
+            ORDER BY flight_count DESC
+            FETCH FIRST :lim ROWS ONLY
+        """, as_dicts=True, lim=POPULAR_ROUTES_ROWS)
     
     # Get airport traffic
-    cursor.execute("""
-        SELECT * FROM v_airport_traffic
-        WHERE total_traffic_7days > 0
-        ORDER BY total_traffic_7days DESC
-        FETCH FIRST 15 ROWS ONLY
-    """)
-    airport_traffic = cursor.fetchall()
+    def airport_traffic():
+        return materialized_view_query('airport_traffic', CACHE_TTL_AIRPORT_TRAFFIC,
+                                       'mv_airport_traffic', 'v_airport_traffic', """
+            SELECT 
+                icao_code,
+                iata_code,
+                airport_name,
+                city,
+                country,
+                departures_7days,
+                arrivals_7days,
+                total_traffic_7days
+            FROM {source}
+            WHERE total_traffic_7days > 0
+            ORDER BY total_traffic_7days DESC
+            FETCH FIRST :lim ROWS ONLY
+        """, as_dicts=True, lim=AIRPORT_TRAFFIC_ROWS)
     
-    cursor.close()
-    conn.close()
-    
-    return render_template_string(HTML_TEMPLATE,
-                                 page='routes',
-                                 current_routes=current_routes,
-                                 popular_routes=popular_routes,
-                                 airport_traffic=airport_traffic)
+    # The cached fragments for these two tables only call their query
+    # when the fragment cache entry has expired, so a typical request makes
+    # one round-trip (active routes). They are deliberately not combined with
+    # the active routes query: a single statement would re-run the 30 day and
+    # 7 day aggregates every time the 5 second active routes result expires
+    return ROUTES_PAGE.render(current_routes=current_routes,
+                              popular_routes=popular_routes,
+                              airport_traffic=airport_traffic)
 
-@app.route('/history')
-def history():
-    """Display flight history"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get recent flights with stats
-    cursor.execute("""
+def history_rows_html(flights):
+    """
+    Table rows for the flight history page, built in one Python loop
+    instead of a Jinja loop (values are escaped here, so the result is Markup)
+    """
+    rows = []
+    for icao, callsign, first_contact, last_contact, positions, max_altitude, avg_speed, _flight_id in flights:
+        if first_contact and last_contact:
+            duration = f"{(last_contact - first_contact).total_seconds() / 60:.1f} min"
+        else:
+            duration = 'N/A'
+        rows.append(
+            f"<tr><td>{escape(icao)}</td>"
+            f"<td><strong>{escape(callsign or 'N/A')}</strong></td>"
+            f"<td>{first_contact.strftime('%Y-%m-%d %H:%M:%S') if first_contact else 'N/A'}</td>"
+            f"<td>{last_contact.strftime('%Y-%m-%d %H:%M:%S') if last_contact else 'N/A'}</td>"
+            f"<td>{duration}</td>"
+            f"<td>{positions}</td>"
+            f"<td class=\"altitude\">{max_altitude or 'N/A'}</td>"
+            f"<td class=\"speed\">{f'{avg_speed:.0f}' if avg_speed else 'N/A'}</td></tr>"
+        )
+    return Markup('\n'.join(rows))
+
+# Flight history columns (running totals kept on flights by the collector;
+# see flight_stats_columns.sql), newest first
+HISTORY_SELECT = """
+        SELECT 
+            icao_address,
+            callsign,
+            first_contact,
+            last_contact,
+            position_count,
+            max_altitude,
+            speed_sum / NULLIF(speed_count, 0) as avg_speed,
+            flight_id
+        FROM flights"""
+HISTORY_ORDER = """
+        ORDER BY last_contact DESC, flight_id DESC
+        FETCH FIRST :lim ROWS ONLY"""
+
+# Until flight_stats_columns.sql has been run: the same columns aggregated
+# from positions, for the page's flights only
+HISTORY_POSITIONS_SELECT = """
         SELECT 
             f.icao_address,
             f.callsign,
-            MIN(p.received_time) as first_contact,
-            MAX(p.received_time) as last_contact,
+            f.first_contact,
+            f.last_contact,
             COUNT(p.position_id) as position_count,
             MAX(p.altitude) as max_altitude,
-            AVG(p.ground_speed) as avg_speed
-        FROM flights f
-        LEFT JOIN positions p ON f.flight_id = p.flight_id
-        GROUP BY f.icao_address, f.callsign
-        ORDER BY last_contact DESC
-        FETCH FIRST 100 ROWS ONLY
-    """)
-    flights = cursor.fetchall()
+            AVG(p.ground_speed) as avg_speed,
+            f.flight_id
+        FROM (
+            SELECT icao_address, callsign, first_contact, last_contact, flight_id
+            FROM flights{where}{order}
+        ) f
+        LEFT JOIN positions p ON p.flight_id = f.flight_id
+        GROUP BY f.flight_id, f.icao_address, f.callsign, f.first_contact, f.last_contact
+        ORDER BY f.last_contact DESC, f.flight_id DESC"""
+
+# Set once flights is found without the total columns, so later pages go
+# straight to the positions aggregate (restart after running
+# flight_stats_columns.sql)
+flight_stats_missing = False
+
+def get_history_page(key, where, input_sizes=None, **params):
+    """
+    One page of flight history: flights matching where, newest first
+    Read from the per-flight totals on flights; until flight_stats_columns.sql
+    has been run, aggregate the page's positions instead
+    """
+    global flight_stats_missing
+    if not flight_stats_missing:
+        try:
+            return cached_query(key, CACHE_TTL_HISTORY, HISTORY_SELECT + where + HISTORY_ORDER,
+                                input_sizes=input_sizes, **params)
+        except oracledb.DatabaseError as e:
+            # ORA-00904 (invalid identifier): the total columns don't exist yet
+            error, = e.args
+            if error.code != 904:
+                raise
+            print("flights has no position total columns; aggregating positions for /history "
+                  "(run flight_stats_columns.sql)")
+            flight_stats_missing = True
+    return cached_query(f'{key}:positions', CACHE_TTL_HISTORY,
+                        HISTORY_POSITIONS_SELECT.format(where=where, order=HISTORY_ORDER),
+                        input_sizes=input_sizes, **params)
+
+@app.route('/history')
+def history():
+    """
+    Display flight history, one page at a time
+    Pages are keyset-paginated: ?before=<last_contact>&id=<flight_id> starts
+    after the last row of the previous page, so every page reads only its own
+    rows from the (last_contact, flight_id) index however large flights grows
+    """
+    limit = min(max(request.args.get('limit', HISTORY_ROWS, type=int), 1), HISTORY_MAX_ROWS)
+    try:
+        before = datetime.fromisoformat(request.args['before'])
+        before_id = request.args.get('id', type=int)
+    except (KeyError, ValueError):
+        before = None
+    # Cursors are the naive last_contact values this page writes; one with a
+    # UTC offset would be compared as if it were local time, so start over
+    if before is not None and before.tzinfo is not None:
+        before = None
     
-    cursor.close()
-    conn.close()
+    # Flights without a last_contact can't carry a cursor (and would sort
+    # first under DESC), so they are left out of the history
+    if before is None:
+        flights = get_history_page(f'flight_history:{limit}', """
+        WHERE last_contact IS NOT NULL""", lim=limit)
+    else:
+        # Without an id, start strictly before the timestamp
+        if before_id is None:
+            before_id = 0
+        # Bound as TIMESTAMP: a plain datetime may be sent as DATE, dropping
+        # the fractional seconds the tie-break on flight_id depends on
+        flights = get_history_page(f'flight_history:{limit}:{before.isoformat()}:{before_id}', """
+        WHERE last_contact < :before
+           OR (last_contact = :before AND flight_id < :before_id)""",
+                                   input_sizes={'before': oracledb.DB_TYPE_TIMESTAMP},
+                                   lim=limit, before=before, before_id=before_id)
     
-    return render_template_string(HTML_TEMPLATE, 
-                                 page='history',
-                                 flights=flights)
+    # Older page link only when this page was full
+    next_url = None
+    if len(flights) == limit and flights[-1][3] is not None:
+        last_flight = flights[-1]
+        next_url = url_for('history', before=last_flight[3].isoformat(), id=last_flight[7],
+                           limit=limit if limit != HISTORY_ROWS else None)
+    
+    return HISTORY_PAGE.render(flight_rows=history_rows_html(flights),
+                               next_url=next_url, first_page=before is None)
+
+# The map page depends only on the receiver location and static file
+# versions (both fixed for the life of the process), so it is rendered on
+# the first request and the same bytes are served afterwards
+map_page = {'html': None, 'etag': None}
 
 @app.route('/map')
 def map_view():
-    """Display interactive map with current aircraft"""
-    return render_template_string(MAP_TEMPLATE)
+    """Display interactive map with current aircraft (aircraft arrive over /stream/aircraft)"""
+    if map_page['html'] is None:
+        html = MAP_PAGE.render(receiver_lat=RECEIVER_LAT, receiver_lon=RECEIVER_LON).encode()
+        map_page['etag'] = content_etag(html)
+        map_page['html'] = html
+    
+    # Weak ETag (kept through compression): revisits get 304 Not Modified
+    response = app.response_class(map_page['html'], mimetype='text/html')
+    response.set_etag(map_page['etag'], weak=True)
+    return response.make_conditional(request)
+
+# Latest map aircraft list, replaced as a whole by the poller thread
+# ('json' is the encoded list sent to every browser, 'gzip' the same bytes
+# compressed once for /api/aircraft and 'etag' their content hash;
+# 'changed' only moves when the list differs)
+aircraft_snapshot = {'json': b'{}', 'gzip': None, 'etag': None, 'updated': None, 'changed': None}
+snapshot_lock = threading.Lock()
+snapshot_refreshed = threading.Condition(snapshot_lock)  # Wakes /stream/aircraft clients
+poller_lock = threading.Lock()
+poller_thread = None
+stream_slots = threading.BoundedSemaphore(STREAM_MAX_CLIENTS)  # Open /stream/aircraft responses
+
+def fetch_map_aircraft_json(connection):
+    """
+    Latest position of each flight seen recently, encoded as JSON columns
+    (struct of arrays): {"icao": [...], "lat": [...], ...} with row i of
+    every array describing one aircraft, so keys are not repeated per row
+    """
+    # More lenient query - last 370 minutes instead of 30
+    with query_cursor(connection) as cursor:
+        # Columns are aliased to the JSON keys, so no per-row Python conversions
+        cursor.outputtypehandler = float_coordinates
+        cursor.execute("""
+            SELECT 
+                a.icao_address as icao,
+                a.registration,
+                a.aircraft_type as "type",
+                f.callsign,
+                p.altitude,
+                p.ground_speed as speed,
+                p.track,
+                p.latitude as lat,
+                p.longitude as lon,
+                p.received_time as "time",
+                p.squawk,
+                a.operator,
+                f.flight_id
+            FROM aircraft a
+            JOIN flights f ON a.icao_address = f.icao_address
+            JOIN (
+                -- Latest position per flight, ranking only the recent rows
+                -- (IDX_POSITIONS_RECENT range scan, no table visits) rather
+                -- than grouping all positions
+                SELECT 
+                    flight_id,
+                    altitude,
+                    ground_speed,
+                    track,
+                    latitude,
+                    longitude,
+                    received_time,
+                    squawk,
+                    ROW_NUMBER() OVER (PARTITION BY flight_id ORDER BY position_id DESC) as rn
+                FROM positions
+                WHERE received_time > SYSDATE - (370/1440)
+                  AND latitude IS NOT NULL
+                  AND longitude IS NOT NULL
+            ) p ON p.flight_id = f.flight_id AND p.rn = 1
+            ORDER BY p.received_time DESC
+        """)
+        
+        # Transpose each fetch batch onto the column lists
+        keys = [column[0].lower() for column in cursor.description]
+        columns = [[] for _ in keys]
+        while rows := cursor.fetchmany(FETCH_ARRAY_SIZE):
+            for values, batch_values in zip(columns, zip(*rows)):
+                values.extend(batch_values)
+    # orjson writes datetimes in ISO 8601 itself
+    return app.json.dumpb(dict(zip(keys, columns)))
+
+def refresh_aircraft_snapshot():
+    """Query the map aircraft on a pooled connection and publish the result"""
+    with POOL.acquire() as connection:
+        body = fetch_map_aircraft_json(connection)
+    now = time.time()
+    with snapshot_lock:
+        changed = body != aircraft_snapshot['json'] or aircraft_snapshot['changed'] is None
+    
+    # Compress and hash outside the lock, once per change rather than once
+    # per poll (so the highest level costs nothing extra per browser)
+    if changed:
+        etag = content_etag(body)
+        compressed = None
+        if len(body) >= app.config['COMPRESS_MIN_SIZE']:
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+    
+    with snapshot_lock:
+        if changed:
+            aircraft_snapshot['json'] = body
+            aircraft_snapshot['gzip'] = compressed
+            aircraft_snapshot['etag'] = etag
+            aircraft_snapshot['changed'] = now
+        aircraft_snapshot['updated'] = now
+        snapshot_refreshed.notify_all()
+
+def poll_aircraft():
+    """Background thread: refresh the map aircraft snapshot every AIRCRAFT_POLL_SECONDS"""
+    while True:
+        time.sleep(AIRCRAFT_POLL_SECONDS)
+        try:
+            refresh_aircraft_snapshot()
+        except Exception as e:
+            # Any error, not only database ones: an exception escaping this
+            # loop would end the thread and freeze every map on this worker
+            print(f"Aircraft poll failed: {e!r}")
+
+def start_aircraft_poller():
+    """
+    Start the poller on first use, or restart it if its thread has died;
+    the first snapshot is taken before returning
+    """
+    global poller_thread
+    if poller_thread is not None and poller_thread.is_alive():
+        return
+    with poller_lock:
+        if poller_thread is None or not poller_thread.is_alive():
+            if poller_thread is not None:
+                print("Aircraft poller thread died; restarting it")
+            refresh_aircraft_snapshot()
+            poller_thread = threading.Thread(target=poll_aircraft, name='aircraft-poller', daemon=True)
+            poller_thread.start()
 
 @app.route('/api/aircraft')
 def api_aircraft():
-    """API endpoint for current aircraft data (JSON)"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # First, let's see what we have
-    cursor.execute("""
-        SELECT COUNT(*) 
-        FROM positions 
-        WHERE latitude IS NOT NULL 
-          AND longitude IS NOT NULL
-    """)
-    total_with_coords = cursor.fetchone()[0]
-    print(f"Total positions with coordinates: {total_with_coords}")
+    """API endpoint for current aircraft data (JSON), served from the poller's snapshot"""
+    start_aircraft_poller()
+    with snapshot_lock:
+        body = aircraft_snapshot['json']
+        compressed = aircraft_snapshot['gzip']
+        etag = aircraft_snapshot['etag']
+        changed = aircraft_snapshot['changed']
     
-    # More lenient query - last 60 minutes instead of 30
-    cursor.execute("""
-        SELECT 
-            a.icao_address,
-            a.registration,
-            a.aircraft_type,
-            f.callsign,
-            p.altitude,
-            p.ground_speed,
-            p.track,
-            p.latitude,
-            p.longitude,
-            p.received_time,
-            p.squawk,
-            a.operator
-        FROM aircraft a
-        JOIN flights f ON a.icao_address = f.icao_address
-        JOIN positions p ON f.flight_id = p.flight_id
-        WHERE p.position_id IN (
-            SELECT MAX(position_id) 
-            FROM positions 
-            WHERE latitude IS NOT NULL 
-              AND longitude IS NOT NULL
-            GROUP BY flight_id
-        )
-        AND p.received_time > SYSDATE - (370/1440)
-        AND p.latitude IS NOT NULL
-        AND p.longitude IS NOT NULL
-        ORDER BY p.received_time DESC
-    """)
+    # Unchanged since the browser's last poll: 304 with no body
+    # (the ETag is a hash of the list, so every worker gives the same one)
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    elif compressed is not None and request.accept_encodings['gzip'] > 0:
+        # Already compressed; Flask-Compress leaves Content-Encoding responses alone
+        # (quality 0, as in "gzip;q=0", means the client refuses gzip)
+        response = app.response_class(compressed, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = app.response_class(body, mimetype='application/json')
+    # Every variant, 304 and identity included, depends on Accept-Encoding
+    response.vary.add('Accept-Encoding')
+    response.set_etag(etag, weak=True)
+    response.last_modified = datetime.fromtimestamp(changed, timezone.utc)
+    response.cache_control.no_cache = True
+    return response
+
+@app.route('/stream/aircraft')
+def stream_aircraft():
+    """
+    Server-Sent Events feed of the map aircraft snapshot: the full list when
+    it changes, otherwise a small 'unchanged' event after each poll.
+    Every open map shares the poller's single query and encoded JSON.
+    At most STREAM_MAX_CLIENTS streams are open at once (503 beyond that),
+    and each ends after STREAM_MAX_SECONDS so its thread is handed back.
+    """
+    if not stream_slots.acquire(blocking=False):
+        return app.response_class('Too many open streams; poll /api/aircraft', status=503,
+                                  mimetype='text/plain', headers={'Retry-After': str(STREAM_MAX_SECONDS)})
+    try:
+        start_aircraft_poller()
+    except Exception:
+        stream_slots.release()
+        raise
     
-    aircraft_list = []
-    for row in cursor.fetchall():
-        aircraft_list.append({
-            'icao': row[0],
-            'registration': row[1],
-            'type': row[2],
-            'callsign': row[3],
-            'altitude': row[4],
-            'speed': row[5],
-            'track': row[6],
-            'lat': float(row[7]) if row[7] else None,
-            'lon': float(row[8]) if row[8] else None,
-            'time': row[9].isoformat() if row[9] else None,
-            'squawk': row[10],
-            'operator': row[11]
-        })
+    def events():
+        # Reconnect a second after the stream ends
+        yield b'retry: 1000\n\n'
+        sent_changed = sent_updated = None
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        while time.monotonic() < deadline:
+            with snapshot_refreshed:
+                if aircraft_snapshot['updated'] == sent_updated:
+                    snapshot_refreshed.wait(timeout=AIRCRAFT_POLL_SECONDS * 3)
+                body = aircraft_snapshot['json']
+                changed = aircraft_snapshot['changed']
+                sent_updated = aircraft_snapshot['updated']
+            if changed != sent_changed:
+                sent_changed = changed
+                yield b'data: ' + body + b'\n\n'
+            else:
+                yield b'event: unchanged\ndata: \n\n'
     
-    print(f"Returning {len(aircraft_list)} aircraft to map")
+    response = app.response_class(events(), mimetype='text/event-stream',
+                                  headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # Runs when the server closes the response, also if the client went away
+    response.call_on_close(stream_slots.release)
+    return response
+
+@app.route('/api/trails')
+@cache.cached(timeout=CACHE_TTL_CURRENT, query_string=True)
+def api_trails():
+    """
+    Recent positions for several flights in one call (JSON)
+    Usage: /api/trails?id=1&id=2 -> {"1": [lat, lon, lat, lon, ...], "2": [...]}
+    (each trail is one flat array of alternating coordinates, oldest first)
+    """
+    flight_ids = sorted(set(request.args.getlist('id', type=int)))[:MAX_TRAIL_FLIGHTS]
     
-    cursor.close()
-    conn.close()
+    trails = {}
+    if flight_ids:
+        # Pad the IN-list to a power of two (repeating the last id) so at most
+        # seven distinct statements (8 to 512 binds) reach the statement cache, not one per count
+        size = 8
+        while size < len(flight_ids):
+            size *= 2
+        flight_ids += flight_ids[-1:] * (size - len(flight_ids))
+        binds = ','.join(f':{i + 1}' for i in range(size))
+        with query_cursor() as cursor:
+            cursor.outputtypehandler = float_coordinates
+            cursor.execute(f"""
+                SELECT flight_id, latitude, longitude
+                FROM positions
+                WHERE flight_id IN ({binds})
+                  AND received_time > SYSDATE - ({TRAIL_MINUTES}/1440)
+                  AND latitude IS NOT NULL
+                  AND longitude IS NOT NULL
+                ORDER BY flight_id, received_time
+            """, flight_ids)
+            for flight_id, lat, lon in cursor:
+                trails.setdefault(flight_id, []).extend((lat, lon))
     
-    return jsonify(aircraft_list)
+    return jsonify(trails)
 
 @app.route('/stats')
 def stats():
     """Display statistics"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Get overall stats
-    cursor.execute("SELECT COUNT(*) FROM aircraft")
-    total_aircraft = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM flights")
-    total_flights = cursor.fetchone()[0]
-    
-    cursor.execute("SELECT COUNT(*) FROM positions")
-    total_positions = cursor.fetchone()[0]
+    # Aircraft heard in the last 390 minutes: the collector keeps
+    # aircraft.last_seen current (one row per aircraft), so this is an
+    # IDX_AIRCRAFT_LASTSEEN range count instead of COUNT(DISTINCT) over positions
+    def active_aircraft():
+        return cached_query('active_aircraft', CACHE_TTL_TOTALS, """
+            SELECT COUNT(*) 
+            FROM aircraft 
+            WHERE last_seen > SYSDATE - INTERVAL '390' MINUTE
+        """)[0][0]
     
-    cursor.execute("""
-        SELECT COUNT(DISTINCT icao_address) 
-        FROM positions 
-        WHERE received_time > SYSDATE - INTERVAL '390' MINUTE
-    """)
-    active_aircraft = cursor.fetchone()[0]
-    
-    stats_data = {
-        'total_aircraft': total_aircraft,
-        'total_flights': total_flights,
-        'total_positions': total_positions,
-        'active_aircraft': active_aircraft
-    }
-    
-    # Get hourly statistics for last 24 hours
-    cursor.execute("""
-        SELECT 
-            TRUNC(received_time, 'HH') as hour,
-            COUNT(DISTINCT icao_address) as aircraft_count,
-            COUNT(*) as position_count
-        FROM positions
-        WHERE received_time > SYSDATE - 1
-        GROUP BY TRUNC(received_time, 'HH')
-        ORDER BY hour DESC
-    """)
-    hourly_stats = cursor.fetchall()
+    # Hourly statistics for last 24 hours
+    def hourly():
+        return cached_query('hourly_stats', CACHE_TTL_HOURLY, """
+            SELECT 
+                TRUNC(received_time, 'HH') as hour,
+                COUNT(DISTINCT icao_address) as aircraft_count,
+                COUNT(*) as position_count
+            FROM positions
+            WHERE received_time > SYSDATE - 1
+            GROUP BY TRUNC(received_time, 'HH')
+            ORDER BY hour DESC
+        """, as_dicts=True)
     
-    cursor.close()
-    conn.close()
+    # Overall stats, active aircraft and hourly stats are independent queries
+    stats_data, active, hourly_stats = in_parallel(get_totals, active_aircraft, hourly)
+    stats_data['active_aircraft'] = active
     
-    return render_template_string(HTML_TEMPLATE, 
-                                 page='stats',
-                                 stats=stats_data,
-                                 hourly_stats=hourly_stats)
+    return STATS_PAGE.render(stats=stats_data,
+                             hourly_stats=hourly_stats)
 
 if __name__ == '__main__':
-    print("Starting ADS-B Web Application...")
+    # Development server only; in production run
+    #   gunicorn -c gunicorn_conf.py adsb_webapp_latest:app
+    print("Starting ADS-B Web Application (development server)...")
     print("Open your browser to: http://localhost:5001")
-    app.run(host='0.0.0.0', port=5001, debug=True)
+    app.run(host='0.0.0.0', port=5001, threaded=True)
 
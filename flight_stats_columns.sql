@@ -0,0 +1,100 @@
+-- ============================================================================
+-- FLIGHT HISTORY - PER-FLIGHT POSITION TOTALS
+-- ============================================================================
+-- The /history page computed MIN/MAX(received_time), COUNT(*), MAX(altitude)
+-- and AVG(ground_speed) over every position of every flight, then sorted the
+-- groups to keep 100 rows.
+--
+-- This script adds running totals to flights, maintained by the collector in
+-- the same UPDATE that already sets last_contact once per flight per commit:
+--   position_count - Position reports stored for the flight
+--   max_altitude   - Highest reported altitude (ft)
+--   speed_sum      - Sum of reported ground speeds (kts)
+--   speed_count    - Position reports that had a ground speed
+-- Average speed is speed_sum / speed_count, so it stays exact as rows arrive.
+--
+-- It also indexes (last_contact, flight_id), the /history page order and
+-- keyset cursor, so each history page is read from the index instead of
+-- sorting the table.
+--
+-- Stop the collector while this runs; the backfill below recounts from
+-- positions and would double count rows the collector adds meanwhile.
+-- Restart it afterwards: it checks for these columns at startup and only
+-- maintains the totals once they exist.
+-- ============================================================================
+
+-- Drop objects if they exist
+BEGIN
+    EXECUTE IMMEDIATE 'DROP INDEX idx_flights_last_contact';
+EXCEPTION
+    WHEN OTHERS THEN NULL;
+END;
+/
+
+BEGIN
+    EXECUTE IMMEDIATE 'ALTER TABLE flights DROP (position_count, max_altitude, speed_sum, speed_count)';
+EXCEPTION
+    WHEN OTHERS THEN NULL;
+END;
+/
+
+-- Running totals
+ALTER TABLE flights ADD (
+    position_count NUMBER DEFAULT 0 NOT NULL,
+    max_altitude   NUMBER,
+    speed_sum      NUMBER DEFAULT 0 NOT NULL,
+    speed_count    NUMBER DEFAULT 0 NOT NULL
+);
+
+COMMENT ON COLUMN flights.position_count IS 'Position reports stored for this flight (maintained by the collector)';
+COMMENT ON COLUMN flights.max_altitude IS 'Highest reported altitude in feet (maintained by the collector)';
+COMMENT ON COLUMN flights.speed_sum IS 'Sum of reported ground speeds; average = speed_sum / speed_count';
+COMMENT ON COLUMN flights.speed_count IS 'Position reports with a ground speed';
+
+-- Backfill from existing positions
+MERGE INTO flights f
+USING (
+    SELECT
+        flight_id,
+        COUNT(*) as position_count,
+        MAX(altitude) as max_altitude,
+        NVL(SUM(ground_speed), 0) as speed_sum,
+        COUNT(ground_speed) as speed_count
+    FROM positions
+    WHERE flight_id IS NOT NULL
+    GROUP BY flight_id
+) p
+ON (f.flight_id = p.flight_id)
+WHEN MATCHED THEN UPDATE SET
+    f.position_count = p.position_count,
+    f.max_altitude = p.max_altitude,
+    f.speed_sum = p.speed_sum,
+    f.speed_count = p.speed_count;
+
+COMMIT;
+
+-- Newest flights first for /history (flight_id breaks last_contact ties)
+CREATE INDEX idx_flights_last_contact ON flights(last_contact, flight_id);
+
+PROMPT
+PROMPT ============================================================================
+PROMPT Testing per-flight totals...
+PROMPT ============================================================================
+SELECT COUNT(*) as flights_with_positions FROM flights WHERE position_count > 0;
+
+PROMPT
+PROMPT ============================================================================
+PROMPT SUCCESS! Flight total columns added and backfilled.
+PROMPT ============================================================================
+PROMPT
+PROMPT Sample queries:
+PROMPT
+PROMPT   -- Recent flights with totals (what /history shows)
+PROMPT   SELECT icao_address, callsign, position_count, max_altitude,
+PROMPT          ROUND(speed_sum / NULLIF(speed_count, 0)) as avg_speed
+PROMPT   FROM flights ORDER BY last_contact DESC FETCH FIRST 20 ROWS ONLY;
+PROMPT
+PROMPT   -- Check one flight against its positions
+PROMPT   SELECT f.position_count, (SELECT COUNT(*) FROM positions p WHERE p.flight_id = f.flight_id) as actual
+PROMPT   FROM flights f WHERE f.flight_id = &flight_id;
+PROMPT
@@ -0,0 +1,42 @@
+"""
+================================================================================
+Gunicorn settings for the ADS-B web application
+================================================================================
+Usage:
+    gunicorn -c gunicorn_conf.py adsb_webapp_latest:app
+
+Threaded workers (gthread): each worker handles `threads` requests at once,
+so an open /stream/aircraft map (one long request per browser) ties up one
+thread, not a whole worker. The app caps open streams at STREAM_MAX_CLIENTS
+per worker (further maps poll /api/aircraft), so keep `threads` above it to
+leave threads for page and API requests.
+
+The app is NOT preloaded: adsb_webapp_latest creates its Oracle connection
+pool at import, and pooled connections (sockets) must not be shared across
+forked workers. Each worker imports the app itself and so gets its own pool
+and its own map aircraft poller.
+
+Database sessions: up to workers x DB_POOL_MAX (16); set WEB_CONCURRENCY
+lower if that exceeds the database's session limit.
+================================================================================
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5001')
+
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Worker heartbeat timeout; gthread workers keep heartbeating while a
+# thread serves a long-lived SSE stream
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
@@ -0,0 +1,222 @@
+-- ============================================================================
+-- ROUTES / STATS PAGE AGGREGATES - MATERIALIZED VIEWS AND COUNT ROLLUP
+-- ============================================================================
+-- The /routes page aggregates 30 days (popular routes) and 7 days (airport
+-- traffic) of flight_routes, and every page header counted the aircraft,
+-- flights and positions tables with three COUNT(*) queries.
+--
+-- This script adds:
+--   mv_popular_routes - v_popular_routes_enhanced, refreshed every 10 minutes
+--   mv_airport_traffic - v_airport_traffic, refreshed every 15 minutes
+--   stats_rollup       - One row holding the three table counts, kept current
+--                        by compound triggers (one UPDATE per statement, so
+--                        the collector's batched inserts stay cheap)
+--
+-- v_flight_routes (active routes, last hour) is left as a normal view: it
+-- is filtered on last_contact and must stay current.
+--
+-- Dropping positions partitions does not fire DELETE triggers; run
+--   EXEC resync_stats_rollup;
+-- after partition maintenance to recount.
+-- ============================================================================
+
+-- Drop objects if they exist
+BEGIN
+    EXECUTE IMMEDIATE 'DROP MATERIALIZED VIEW mv_popular_routes';
+EXCEPTION
+    WHEN OTHERS THEN NULL;
+END;
+/
+
+BEGIN
+    EXECUTE IMMEDIATE 'DROP MATERIALIZED VIEW mv_airport_traffic';
+EXCEPTION
+    WHEN OTHERS THEN NULL;
+END;
+/
+
+BEGIN
+    EXECUTE IMMEDIATE 'DROP TABLE stats_rollup PURGE';
+EXCEPTION
+    WHEN OTHERS THEN NULL;
+END;
+/
+
+-- Popular routes (last 30 days), same columns as v_popular_routes_enhanced
+CREATE MATERIALIZED VIEW mv_popular_routes
+BUILD IMMEDIATE
+REFRESH COMPLETE
+START WITH SYSDATE NEXT SYSDATE + 10/1440
+AS
+SELECT
+    route_code,
+    origin_icao,
+    origin_iata,
+    origin_name,
+    origin_city,
+    dest_icao,
+    dest_iata,
+    dest_name,
+    dest_city,
+    flight_count,
+    unique_aircraft,
+    avg_distance_nm,
+    first_seen,
+    last_seen
+FROM v_popular_routes_enhanced;
+
+COMMENT ON MATERIALIZED VIEW mv_popular_routes IS 'v_popular_routes_enhanced snapshot, complete refresh every 10 minutes';
+
+-- Airport traffic (last 7 days), same columns as v_airport_traffic
+CREATE MATERIALIZED VIEW mv_airport_traffic
+BUILD IMMEDIATE
+REFRESH COMPLETE
+START WITH SYSDATE NEXT SYSDATE + 15/1440
+AS
+SELECT
+    airport_id,
+    icao_code,
+    iata_code,
+    airport_name,
+    city,
+    country,
+    departures_7days,
+    arrivals_7days,
+    total_traffic_7days
+FROM v_airport_traffic;
+
+COMMENT ON MATERIALIZED VIEW mv_airport_traffic IS 'v_airport_traffic snapshot, complete refresh every 15 minutes';
+
+-- Table counts shown in the page headers
+CREATE TABLE stats_rollup (
+    rollup_id       NUMBER(1) DEFAULT 1 PRIMARY KEY CHECK (rollup_id = 1),
+    total_aircraft  NUMBER NOT NULL,
+    total_flights   NUMBER NOT NULL,
+    total_positions NUMBER NOT NULL
+);
+
+COMMENT ON TABLE stats_rollup IS 'Single row of aircraft/flights/positions counts maintained by triggers';
+
+INSERT INTO stats_rollup (rollup_id, total_aircraft, total_flights, total_positions)
+SELECT 1,
+       (SELECT COUNT(*) FROM aircraft),
+       (SELECT COUNT(*) FROM flights),
+       (SELECT COUNT(*) FROM positions)
+FROM dual;
+
+COMMIT;
+
+-- Recount from the base tables (after partition drops or bulk loads)
+CREATE OR REPLACE PROCEDURE resync_stats_rollup AS
+BEGIN
+    UPDATE stats_rollup
+    SET total_aircraft  = (SELECT COUNT(*) FROM aircraft),
+        total_flights   = (SELECT COUNT(*) FROM flights),
+        total_positions = (SELECT COUNT(*) FROM positions)
+    WHERE rollup_id = 1;
+    COMMIT;
+END;
+/
+
+-- One rollup UPDATE per statement, however many rows it inserted/deleted
+CREATE OR REPLACE TRIGGER trg_aircraft_rollup
+FOR INSERT OR DELETE ON aircraft
+COMPOUND TRIGGER
+    delta NUMBER := 0;
+
+    AFTER EACH ROW IS
+    BEGIN
+        IF INSERTING THEN
+            delta := delta + 1;
+        ELSE
+            delta := delta - 1;
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        IF delta != 0 THEN
+            UPDATE stats_rollup SET total_aircraft = total_aircraft + delta WHERE rollup_id = 1;
+        END IF;
+    END AFTER STATEMENT;
+END trg_aircraft_rollup;
+/
+
+CREATE OR REPLACE TRIGGER trg_flights_rollup
+FOR INSERT OR DELETE ON flights
+COMPOUND TRIGGER
+    delta NUMBER := 0;
+
+    AFTER EACH ROW IS
+    BEGIN
+        IF INSERTING THEN
+            delta := delta + 1;
+        ELSE
+            delta := delta - 1;
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        IF delta != 0 THEN
+            UPDATE stats_rollup SET total_flights = total_flights + delta WHERE rollup_id = 1;
+        END IF;
+    END AFTER STATEMENT;
+END trg_flights_rollup;
+/
+
+CREATE OR REPLACE TRIGGER trg_positions_rollup
+FOR INSERT OR DELETE ON positions
+COMPOUND TRIGGER
+    delta NUMBER := 0;
+
+    AFTER EACH ROW IS
+    BEGIN
+        IF INSERTING THEN
+            delta := delta + 1;
+        ELSE
+            delta := delta - 1;
+        END IF;
+    END AFTER EACH ROW;
+
+    AFTER STATEMENT IS
+    BEGIN
+        IF delta != 0 THEN
+            UPDATE stats_rollup SET total_positions = total_positions + delta WHERE rollup_id = 1;
+        END IF;
+    END AFTER STATEMENT;
+END trg_positions_rollup;
+/
+
+PROMPT
+PROMPT ============================================================================
+PROMPT Testing mv_popular_routes...
+PROMPT ============================================================================
+SELECT COUNT(*) as route_count FROM mv_popular_routes;
+
+PROMPT
+PROMPT ============================================================================
+PROMPT Testing mv_airport_traffic...
+PROMPT ============================================================================
+SELECT COUNT(*) as airport_count FROM mv_airport_traffic;
+
+PROMPT
+PROMPT ============================================================================
+PROMPT Testing stats_rollup...
+PROMPT ============================================================================
+SELECT total_aircraft, total_flights, total_positions FROM stats_rollup;
+
+PROMPT
+PROMPT ============================================================================
+PROMPT SUCCESS! Materialized views, rollup table and triggers created.
+PROMPT ============================================================================
+PROMPT
+PROMPT Sample queries:
+PROMPT
+PROMPT   -- Refresh the materialized views now instead of waiting for the schedule
+PROMPT   EXEC DBMS_MVIEW.REFRESH('MV_POPULAR_ROUTES,MV_AIRPORT_TRAFFIC', 'CC');
+PROMPT
+PROMPT   -- Check the rollup against the base tables
+PROMPT   SELECT r.total_positions, (SELECT COUNT(*) FROM positions) as actual
+PROMPT   FROM stats_rollup r;
+PROMPT